@@ -0,0 +1,101 @@
+"""Run many Lox scripts in parallel on a pool of warm worker processes.
+
+Each worker imports the interpreter once and then runs script after script,
+each with a fresh `Lox` and its own captured stdout and stderr, so a batch
+pays process startup once per core instead of once per script.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import glob
+import io
+import os
+import time
+import traceback
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+if typing.TYPE_CHECKING:
+    import lox
+
+# How each worker creates a fresh `Lox` per script, set at worker startup.
+_make_lox: Callable[[], lox.Lox]
+
+
+class ScriptResult:
+    def __init__(self, script: str, status: int, stdout: str, stderr: str, elapsed):
+        self.script = script
+        # Exit status as `lox.py` would report it: 0, 65, 66 or 70.
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+
+
+def expand(patterns: Iterable[str]) -> list[str]:
+    """Expand glob patterns the shell left alone, keeping plain paths as is."""
+    scripts = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            scripts.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            scripts.append(pattern)
+
+    return scripts
+
+
+def _start_worker(make_lox: Callable[..., lox.Lox], options: dict):
+    global _make_lox
+    _make_lox = functools.partial(make_lox, **options)
+    # Creating one interpreter up front warms up everything a run touches.
+    _make_lox()
+
+
+def run_script(script: str) -> ScriptResult:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            _make_lox().run_file(script)
+        except SystemExit as error:
+            status = error.code or 0
+        except OSError as error:
+            print(f"Cannot read {script}: {error.strerror}", file=stderr)
+            status = 66
+        except Exception:
+            # A crash in the interpreter itself fails this script, not the
+            # whole batch.
+            traceback.print_exc(file=stderr)
+            status = 70
+
+    elapsed = time.perf_counter() - start
+    return ScriptResult(script, status, stdout.getvalue(), stderr.getvalue(), elapsed)
+
+
+def run_batch(
+    scripts: list[str],
+    jobs: int,
+    make_lox: Callable[..., lox.Lox],
+    options: dict,
+) -> Iterator[ScriptResult]:
+    """Yield one result per script, in the order the scripts were given.
+
+    Every script runs in `make_lox(**options)`, which must be picklable.
+    """
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_start_worker, initargs=(make_lox, options)
+    ) as executor:
+        # Small chunks amortize the IPC round trips without letting one
+        # worker hoard a long tail of scripts.
+        chunksize = max(1, len(scripts) // (jobs * 8))
+        yield from executor.map(run_script, scripts, chunksize=chunksize)
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
@@ -0,0 +1,182 @@
+"""Benchmark suite behind `lox.py bench`.
+
+Each workload is a generated Lox program. Scanning, parsing and
+interpretation (resolver included) are timed separately over several
+repetitions, each with a fresh `Lox` so globals never leak between runs.
+Results are plain JSON so they can be saved as a baseline and compared
+against later runs.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import statistics
+import sys
+import time
+import typing
+
+from parser import Parser
+from resolver import Resolver
+
+if typing.TYPE_CHECKING:
+    import lox
+
+FORMAT_VERSION = 1
+PHASES = ("scan", "parse", "interpret")
+
+
+def arithmetic() -> str:
+    return """
+var i = 0;
+var total = 0;
+while (i < 20000) {
+  total = total + i * 2 - i / 4;
+  if (total > 1000000) total = total - 1000000;
+  i = i + 1;
+}
+print total;
+"""
+
+
+def strings() -> str:
+    return """
+var text = "";
+var line = "";
+for (var i = 0; i < 5000; i = i + 1) {
+  line = line + "x";
+  if (line == "xxxxxxxxxx") {
+    text = text + line + ";";
+    line = "";
+  }
+}
+print text;
+"""
+
+
+def nested_blocks(depth: int = 40) -> str:
+    # Every level declares a variable that the innermost loop reads, so
+    # lookups have to walk up the whole chain of scopes.
+    opening = "".join(f"{{ var v{level} = {level};\n" for level in range(depth))
+    reads = " + ".join(f"v{level}" for level in range(0, depth, 4))
+    closing = "}\n" * depth
+    return (
+        f"var total = 0;\n{opening}"
+        f"for (var i = 0; i < 5000; i = i + 1) total = total + {reads};\n"
+        f"{closing}print total;\n"
+    )
+
+
+def globals_(count: int = 500) -> str:
+    declarations = "".join(f"var g{n} = {n};\n" for n in range(count))
+    updates = "".join(f"  g{n} = g{n} + g{(n + 1) % count};\n" for n in range(count))
+    return (
+        f"{declarations}for (var i = 0; i < 50; i = i + 1) {{\n{updates}}}\nprint g0;\n"
+    )
+
+
+def large_file(lines: int = 10000) -> str:
+    # Mostly straight-line code: the point is the size of the source, not
+    # the work it does once it runs.
+    templates = [
+        "var value_{i} = {i} * (2 + {i}) - 1; // value {i}\n",
+        'print "line {i}";\n',
+        "if (value_{j} > {i}) {{ value_{j} = {i}; }}"
+        " else {{ value_{j} = value_{j} - 1; }}\n",
+        "{{ var local = value_{j}; local = local / 2; }}\n",
+    ]
+    return "".join(
+        templates[i % len(templates)].format(i=i, j=i - i % len(templates))
+        for i in range(lines)
+    )
+
+
+WORKLOADS: dict[str, typing.Callable[[], str]] = {
+    "arithmetic": arithmetic,
+    "strings": strings,
+    "nested-blocks": nested_blocks,
+    "globals": globals_,
+    "large-file": large_file,
+}
+
+
+def time_phases(source: str, make_lox: typing.Callable[[], lox.Lox]) -> dict:
+    """Scan, parse and interpret `source` once, returning seconds per phase."""
+    lox = make_lox()
+
+    start = time.perf_counter()
+    tokens = lox.scanner(source, interpreter=lox).scan_tokens()
+    scanned = time.perf_counter()
+    statements = Parser(tokens, interpreter=lox).parse()
+    parsed = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        Resolver(lox.global_slots).resolve(statements)
+        lox.interpreter.interpret(statements)
+        # Write buffered output while stdout is still redirected; the
+        # sink's flush timer would otherwise print it after the block.
+        lox.output.flush()
+    interpreted = time.perf_counter()
+
+    if lox.had_error or lox.had_runtime_error:
+        raise RuntimeError("benchmark workload failed")
+
+    return {
+        "scan": scanned - start,
+        "parse": parsed - scanned,
+        "interpret": interpreted - parsed,
+    }
+
+
+def run(
+    workloads: typing.Iterable[str],
+    make_lox: typing.Callable[[], lox.Lox],
+    repeat: int,
+    settings: dict,
+) -> dict:
+    results = {}
+    for name in workloads:
+        source = WORKLOADS[name]()
+        samples = [time_phases(source, make_lox) for _ in range(repeat)]
+        results[name] = {
+            phase: {
+                "min": min(sample[phase] for sample in samples),
+                "median": statistics.median(sample[phase] for sample in samples),
+                "mean": statistics.fmean(sample[phase] for sample in samples),
+            }
+            for phase in PHASES
+        }
+
+    return {
+        "version": FORMAT_VERSION,
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        **settings,
+        "results": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float, floor: float = 0.001
+) -> list[tuple]:
+    """Pair up median timings present in both runs.
+
+    Returns (workload, phase, baseline, current, ratio, regressed) tuples; a
+    phase regressed when it got slower by more than `threshold` (0.1 = 10%).
+    Phases that take less than `floor` seconds in both runs are mostly timer
+    noise and never count as regressions.
+    """
+    rows = []
+    for name, phases in current["results"].items():
+        for phase, timing in phases.items():
+            try:
+                before = baseline["results"][name][phase]["median"]
+            except KeyError:
+                continue
+
+            after = timing["median"]
+            ratio = after / before if before else 1.0
+            regressed = ratio > 1 + threshold and max(before, after) >= floor
+            rows.append((name, phase, before, after, ratio, regressed))
+
+    return rows
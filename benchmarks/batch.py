@@ -0,0 +1,58 @@
+"""Scripts per second: one `lox.py` process per script vs. `lox.py batch`.
+
+Writes `--scripts` small scripts to a temporary directory and runs them both
+ways; the per-process side pays interpreter startup and imports every time.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+SCRIPT = """
+var total = 0;
+for (var i = 0; i < {n}; i = i + 1) total = total + i;
+print total;
+"""
+
+
+@click.command()
+@click.option("--scripts", default=40, show_default=True)
+@click.option("--jobs", default=os.cpu_count() or 1, show_default=True)
+def main(scripts, jobs):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number in range(scripts):
+            path = os.path.join(directory, f"script{number}.lox")
+            with open(path, "w") as file:
+                file.write(SCRIPT.format(n=number * 10))
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            subprocess.run(
+                [sys.executable, "lox.py", "--no-cache", path],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+        per_process = time.perf_counter() - start
+
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "lox.py", "batch", "--no-cache", "-j", str(jobs), *paths],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        batched = time.perf_counter() - start
+
+    click.echo(f"per process {scripts / per_process:8.1f} scripts/s")
+    click.echo(f"batch       {scripts / batched:8.1f} scripts/s ({jobs} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Overhead of execution budgets on a statement-heavy loop.
+
+"steps" and "timeout" are what `--max-steps` and `--timeout` use; "clock"
+reads the clock on every statement, the obvious alternative. Setups are
+interleaved so machine drift hits all of them.
+"""
+
+from __future__ import annotations
+
+import time
+
+import click
+
+from benchmarks.common import run_source
+from exceptions import LoxBudgetExceeded
+from interpreter import Interpreter
+from lox import Lox
+
+
+class ClockInterpreter(Interpreter):
+    """Checks a deadline with `time.monotonic()` before every statement."""
+
+    def __init__(self, interpreter, timeout: float):
+        super().__init__(interpreter)
+        self.deadline = time.monotonic() + timeout
+
+    def execute(self, stmt):
+        if time.monotonic() >= self.deadline:
+            raise LoxBudgetExceeded(stmt.line, "Time budget exceeded.")
+        stmt.accept(self)
+
+
+def workload(iterations: int) -> str:
+    return (
+        "var total = 0;\n"
+        f"for (var i = 0; i < {iterations}; i = i + 1) {{\n"
+        "  var half = i / 2;\n"
+        "  if (half > 10) total = total + half; else total = total - 1;\n"
+        "}\n"
+        "print total;\n"
+    )
+
+
+def clock() -> Lox:
+    lox = Lox(use_cache=False)
+    lox.interpreter = ClockInterpreter(lox, 3600)
+    return lox
+
+
+SETUPS = {
+    "plain": lambda: Lox(use_cache=False),
+    "steps": lambda: Lox(use_cache=False, max_steps=10**12),
+    "timeout": lambda: Lox(use_cache=False, timeout=3600),
+    "clock": clock,
+}
+
+
+@click.command()
+@click.option("--iterations", default=20_000, show_default=True)
+@click.option("--repeat", default=12, show_default=True)
+def main(iterations, repeat):
+    source = workload(iterations)
+    times = {name: [] for name in SETUPS}
+    names = list(SETUPS)
+    for repetition in range(repeat):
+        # Rotate the order so no setup always runs first.
+        shift = repetition % len(names)
+        for name in names[shift:] + names[:shift]:
+            times[name].append(run_source(source, SETUPS[name]()))
+
+    baseline = min(times["plain"])
+    for name, samples in times.items():
+        best = min(samples)
+        overhead = (best - baseline) / baseline * 100
+        click.echo(f"{name:<7} best {best:7.3f}s  overhead {overhead:6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Front-end time with and without the __loxcache__ parse cache."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+
+import click
+
+import cache
+from lox import Lox
+
+
+def generate(lines: int) -> str:
+    statements = []
+    for i in range(lines):
+        statements.append(
+            f"var v{i} = {i} * (2 + {i % 7}) - {i % 3} / 4;\n"
+            f'if (v{i} > {i}) {{ print "big" + "{i}"; }} else {{ v{i} = v{i} + 1; }}\n'
+        )
+    return "".join(statements)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+@click.command()
+@click.option("--lines", default=20_000, show_default=True)
+def main(lines):
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "generated.lox")
+        source = generate(lines)
+        with open(script, "w") as f:
+            f.write(source)
+
+        parse_time, statements = timed(Lox().parse, source)
+        store_time, _ = timed(cache.store, script, source, statements)
+        load_time, loaded = timed(cache.load, script, source)
+        assert loaded is not None and len(loaded) == len(statements)
+
+        size = os.path.getsize(cache.cache_path(script))
+        click.echo(f"source       {len(source) / 1e6:8.2f} MB")
+        click.echo(f"cache file   {size / 1e6:8.2f} MB")
+        click.echo(f"scan+parse   {parse_time:8.3f}s")
+        click.echo(f"cache store  {store_time:8.3f}s")
+        click.echo(f"cache load   {load_time:8.3f}s  x{parse_time / load_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
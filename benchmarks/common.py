@@ -0,0 +1,30 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the scripts from the repository root, e.g. `python -m benchmarks.resolver`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import time
+
+from lox import Lox
+
+
+def run_source(source: str, lox: Lox = None) -> float:
+    """Run `source` with its output discarded and return the elapsed seconds."""
+    lox = lox or Lox()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.run(source)
+        elapsed = time.perf_counter() - start
+
+    if lox.had_error or lox.had_runtime_error:
+        raise RuntimeError("benchmark script failed")
+
+    return elapsed
+
+
+def best_of(repeat: int, func, *args, **kwargs) -> float:
+    return min(func(*args, **kwargs) for _ in range(repeat))
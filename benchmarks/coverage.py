@@ -0,0 +1,99 @@
+"""Overhead of line coverage on a statement-heavy loop.
+
+"bitmap" is what `--coverage` uses; "dict" counts every node execution in
+a dict and "hook" marks lines from the interpreter's execute event, the two
+obvious alternatives. Setups are interleaved so machine drift hits all.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import run_source
+from interpreter import Interpreter
+from linecov import CoveringInterpreter, LineCoverage
+from lox import Lox
+
+
+class CountingInterpreter(Interpreter):
+    """Counts executions of every statement and expression node in a dict."""
+
+    def __init__(self, interpreter):
+        super().__init__(interpreter)
+        self.counts = {}
+
+    def execute(self, stmt):
+        self.counts[stmt] = self.counts.get(stmt, 0) + 1
+        stmt.accept(self)
+
+    def evaluate(self, expr):
+        self.counts[expr] = self.counts.get(expr, 0) + 1
+        return expr.accept(self)
+
+
+def workload(iterations: int) -> str:
+    return (
+        "var total = 0;\n"
+        f"for (var i = 0; i < {iterations}; i = i + 1) {{\n"
+        "  var half = i / 2;\n"
+        "  if (half > 10) total = total + half; else total = total - 1;\n"
+        "}\n"
+        "print total;\n"
+    )
+
+
+def plain(lines: int) -> Lox:
+    return Lox(use_cache=False)
+
+
+def bitmap(lines: int) -> Lox:
+    lox = Lox(use_cache=False)
+    coverage = LineCoverage()
+    coverage.allocate(lines)
+    lox.interpreter = CoveringInterpreter(lox, coverage)
+    return lox
+
+
+def counting(lines: int) -> Lox:
+    lox = Lox(use_cache=False)
+    lox.interpreter = CountingInterpreter(lox)
+    return lox
+
+
+def hook(lines: int) -> Lox:
+    lox = Lox(use_cache=False)
+    executed = bytearray(lines + 2)
+
+    def mark(stmt):
+        executed[stmt.line] = 1
+
+    lox.interpreter.subscribe("execute", mark)
+    return lox
+
+
+SETUPS = {"plain": plain, "bitmap": bitmap, "dict": counting, "hook": hook}
+
+
+@click.command()
+@click.option("--iterations", default=20_000, show_default=True)
+@click.option("--repeat", default=12, show_default=True)
+def main(iterations, repeat):
+    source = workload(iterations)
+    lines = source.count("\n") + 1
+    times = {name: [] for name in SETUPS}
+    names = list(SETUPS)
+    for repetition in range(repeat):
+        # Rotate the order so no setup always runs first.
+        shift = repetition % len(names)
+        for name in names[shift:] + names[:shift]:
+            times[name].append(run_source(source, SETUPS[name](lines)))
+
+    baseline = min(times["plain"])
+    for name, samples in times.items():
+        best = min(samples)
+        overhead = (best - baseline) / baseline * 100
+        click.echo(f"{name:<6} best {best:7.3f}s  overhead {overhead:6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Requests per second for a small snippet: compiled once vs. from source.
+
+"source" scans, parses and resolves the snippet on every request, like
+calling `Lox.run`; "compiled" reuses one `Program` and only executes it.
+"""
+
+from __future__ import annotations
+
+import time
+
+import click
+
+from embed import Engine
+from lox import ENGINES
+
+SNIPPET = """
+var total = 0;
+for (var i = 0; i < count; i = i + 1) {
+  if (i > 2) total = total + i * price; else total = total + price;
+}
+print name + " owes";
+print total;
+"""
+
+
+@click.command()
+@click.option("--requests", default=2_000, show_default=True)
+def main(requests):
+    for name in ENGINES:
+        engine = Engine(engine=name)
+        program = engine.compile(SNIPPET)
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            program_per_request = engine.compile(SNIPPET)
+            engine.run(program_per_request, {"count": 5.0, "price": 2.5, "name": "x"})
+        from_source = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            engine.run(program, {"count": 5.0, "price": 2.5, "name": "x"})
+        compiled = time.perf_counter() - start
+
+        click.echo(
+            f"{name:<8} source {requests / from_source:8.0f} req/s  "
+            f"compiled {requests / compiled:8.0f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the execution engines on loop-heavy scripts."""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import best_of, run_source
+from lox import ENGINES, Lox
+
+WORKLOADS = {
+    "global-loop": (
+        "var total = 0; var i = 0;\n"
+        "while (i < {n}) {{ total = total + i * 2 - 1; i = i + 1; }}\n"
+        "print total;\n"
+    ),
+    "local-for": (
+        "{{ var total = 0;\n"
+        "  for (var i = 0; i < {n}; i = i + 1) {{\n"
+        "    if (i / 2 > 10) total = total + 1; else total = total - 1;\n"
+        "  }}\n"
+        "  print total; }}\n"
+    ),
+    "fib": (
+        "var a = 0; var temp; var count = 0;\n"
+        "for (var b = 1; count < {n}; b = temp + b) {{\n"
+        "  temp = a; a = b; count = count + 1;\n"
+        "  if (a > 1000000) {{ a = 0; b = 1; }}\n"
+        "}}\n"
+    ),
+}
+
+
+@click.command()
+@click.option("--iterations", default=100_000, show_default=True)
+@click.option("--repeat", default=3, show_default=True)
+def main(iterations, repeat):
+    for name, template in WORKLOADS.items():
+        source = template.format(n=iterations)
+        baseline = None
+        for engine in ENGINES:
+            elapsed = best_of(repeat, lambda: run_source(source, Lox(engine=engine)))
+            baseline = baseline or elapsed
+            click.echo(
+                f"{name:<12} {engine:<8} {elapsed:8.3f}s  x{baseline / elapsed:5.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
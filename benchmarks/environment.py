@@ -0,0 +1,90 @@
+"""Global variable lookups: the previous `Environment` vs. the current one.
+
+"legacy" is the implementation that tested membership with `in .keys()`
+and then looked the name up again, and assigned through a throwaway dict.
+The micro benchmark runs `get` and `assign` directly, with names that are
+interned (as the scanners now produce them) or freshly sliced (as before).
+The tree interpreter keeps globals in slots now; see `benchmarks.globals`.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+
+import click
+
+from environment import Environment
+from exceptions import LoxRuntimeError
+from tokens import Token, TokenType
+
+NAMES = ["total", "count", "index", "limit", "value_one", "value_two"]
+
+
+class LegacyEnvironment(Environment):
+    def get(self, name: Token):
+        if name.lexeme in self.values.keys():
+            return self.values.get(name.lexeme)
+
+        if self.enclosing is not None:
+            return self.enclosing.get(name)
+
+        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+    def assign(self, name: Token, value: object):
+        if name.lexeme in self.values.keys():
+            self.values.update({name.lexeme: value})
+            return
+
+        if self.enclosing is not None:
+            self.enclosing.assign(name, value)
+            return
+
+        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+
+def tokens(interned: bool) -> list[Token]:
+    source = " ".join(NAMES)
+    result = []
+    start = 0
+    for name in NAMES:
+        # Slicing from a larger string gives a fresh, non-interned object.
+        lexeme = source[start : start + len(name)]
+        start += len(name) + 1
+        if interned:
+            lexeme = sys.intern(lexeme)
+        result.append(Token(TokenType.IDENTIFIER, lexeme, None, 1))
+
+    return result
+
+
+def micro(environment_class, interned: bool, number: int) -> float:
+    environment = environment_class()
+    for name in NAMES:
+        environment.define(sys.intern(name), 1.0)
+    names = tokens(interned)
+
+    def loop():
+        get = environment.get
+        assign = environment.assign
+        for name in names:
+            assign(name, get(name))
+
+    return min(timeit.repeat(loop, number=number, repeat=5)) / number / len(names)
+
+
+@click.command()
+@click.option("--number", default=20_000, show_default=True)
+def main(number):
+    for name, environment_class in (
+        ("legacy", LegacyEnvironment),
+        ("current", Environment),
+    ):
+        for interned in (False, True):
+            per_name = micro(environment_class, interned, number)
+            label = "interned" if interned else "sliced"
+            click.echo(f"{name:<8} {label:<9} get+assign {per_name * 1e9:6.1f} ns/name")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Global variable access: name-keyed dict vs. the slot-indexed globals table.
+
+"dict" looks globals up by name in an `Environment`, as the tree interpreter
+did before globals got slots; "slots" is the current `GlobalEnvironment`.
+The loop body sits in a block, as in `examples/fib.lox`, and mixes global
+reads and writes with a local. Setups are interleaved so machine drift hits
+both.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import run_source
+from environment import Environment
+from interpreter import Interpreter
+from lox import Lox
+
+
+# noinspection PyShadowingNames
+class DictGlobalsInterpreter(Interpreter):
+    def __init__(self, interpreter):
+        super().__init__(interpreter)
+        self.names = Environment()
+
+    def visit_variable_expr(self, expr):
+        if expr.depth is None:
+            return self.names.get(expr.name)
+
+        return self.environment.get_at(expr.depth, expr.slot)
+
+    def visit_assign_expr(self, expr):
+        value = self.evaluate(expr.value)
+        if expr.depth is None:
+            self.names.assign(expr.name, value)
+        else:
+            self.environment.assign_at(expr.depth, expr.slot, value)
+
+        return value
+
+    def visit_var_stmt(self, stmt):
+        if stmt.depth is not None:
+            return super().visit_var_stmt(stmt)
+
+        value = None
+        if stmt.initializer is not None:
+            value = self.evaluate(stmt.initializer)
+        self.names.define(stmt.name.lexeme, value)
+
+
+def workload(iterations: int) -> str:
+    return (
+        "var total = 0; var step = 2; var i = 0;\n"
+        f"while (i < {iterations}) {{\n"
+        "  var local = i;\n"
+        "  total = total + step * local;\n"
+        "  i = i + 1;\n"
+        "}\n"
+        "print total;\n"
+    )
+
+
+def dict_globals() -> Lox:
+    lox = Lox(use_cache=False)
+    lox.interpreter = DictGlobalsInterpreter(lox)
+    return lox
+
+
+SETUPS = {"dict": dict_globals, "slots": lambda: Lox(use_cache=False)}
+
+
+@click.command()
+@click.option("--iterations", default=50_000, show_default=True)
+@click.option("--repeat", default=10, show_default=True)
+def main(iterations, repeat):
+    source = workload(iterations)
+    times = {name: [] for name in SETUPS}
+    for repetition in range(repeat):
+        names = list(SETUPS) if repetition % 2 else list(SETUPS)[::-1]
+        for name in names:
+            times[name].append(run_source(source, SETUPS[name]()))
+
+    baseline = min(times["dict"])
+    for name, samples in times.items():
+        best = min(samples)
+        click.echo(
+            f"{name:<5} best {best:7.3f}s  {(baseline - best) / baseline * 100:5.1f}% "
+            "faster than dict"
+        )
+
+
+if __name__ == "__main__":
+    main()
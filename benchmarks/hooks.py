@@ -0,0 +1,86 @@
+"""Cost of the interpreter's event hooks.
+
+"plain" is a fresh interpreter: with nothing subscribed it runs exactly the
+unhooked methods, so it is the baseline. "detached" had hooks subscribed
+and removed again; switching classes makes CPython turn the instance's
+attributes into a regular dict, which can cost a few percent. "execute hook"
+and "all hooks" show what listening costs. Setups are interleaved so drift
+on a busy machine hits them all alike.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import run_source
+from interpreter import EVENTS
+from lox import Lox
+
+
+def workload(iterations: int) -> str:
+    return (
+        "var total = 0;\n"
+        f"for (var i = 0; i < {iterations}; i = i + 1) {{\n"
+        "  var half = i / 2;\n"
+        "  { total = total + half; }\n"
+        "}\n"
+        "print total;\n"
+    )
+
+
+def noop(*args):
+    pass
+
+
+def plain() -> Lox:
+    return Lox(use_cache=False)
+
+
+def detached() -> Lox:
+    lox = Lox(use_cache=False)
+    for event in EVENTS:
+        lox.interpreter.subscribe(event, noop)
+    for event in EVENTS:
+        lox.interpreter.unsubscribe(event, noop)
+    return lox
+
+
+def execute_hook() -> Lox:
+    lox = Lox(use_cache=False)
+    lox.interpreter.subscribe("execute", noop)
+    return lox
+
+
+def all_hooks() -> Lox:
+    lox = Lox(use_cache=False)
+    for event in EVENTS:
+        lox.interpreter.subscribe(event, noop)
+    return lox
+
+
+SETUPS = {
+    "plain": plain,
+    "detached": detached,
+    "execute hook": execute_hook,
+    "all hooks": all_hooks,
+}
+
+
+@click.command()
+@click.option("--iterations", default=20_000, show_default=True)
+@click.option("--repeat", default=15, show_default=True)
+def main(iterations, repeat):
+    source = workload(iterations)
+    times = {name: [] for name in SETUPS}
+    for _ in range(repeat):
+        for name, setup in SETUPS.items():
+            times[name].append(run_source(source, setup()))
+
+    for name, samples in times.items():
+        samples.sort()
+        spread = (samples[-1] - samples[0]) / samples[0] * 100
+        click.echo(f"{name:<13} best {samples[0]:7.3f}s  spread {spread:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Per-iteration cost of `for` loops whose body declares nothing or a local.
+
+`for` desugars into a `while` around a block, so every iteration used to
+enter a fresh scope. Run it on two checkouts to compare them.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import best_of, run_source
+from lox import Lox
+
+LOOPS = {
+    "no locals": (
+        "var total = 0;\n"
+        "for (var i = 0; i < {n}; i = i + 1) {{\n"
+        "  total = total + i;\n"
+        "}}\n"
+    ),
+    "one local": (
+        "var total = 0;\n"
+        "for (var i = 0; i < {n}; i = i + 1) {{\n"
+        "  var twice = i * 2;\n"
+        "  total = total + twice;\n"
+        "}}\n"
+    ),
+}
+
+
+@click.command()
+@click.option("--iterations", default=50_000, show_default=True)
+@click.option("--repeat", default=5, show_default=True)
+def main(iterations, repeat):
+    for engine in ("tree", "closure"):
+        for name, loop in LOOPS.items():
+            source = loop.format(n=iterations)
+            best = best_of(
+                repeat, lambda: run_source(source, Lox(engine=engine, use_cache=False))
+            )
+            click.echo(
+                f"{engine:<8} {name:<10} {best / iterations * 1e9:8.0f} ns/iteration"
+            )
+
+
+if __name__ == "__main__":
+    main()
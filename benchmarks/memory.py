@@ -0,0 +1,68 @@
+"""Bytes per token and per AST node on a generated 100k-line program.
+
+Tokens are measured both as a list of `Token` objects and as a `TokenArray`.
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+import click
+
+from lox import Lox
+from optimizer import count_nodes
+from parser import Parser
+from scanner import ArrayScanner, FastScanner
+
+LINES = [
+    "var value_{i} = {i} * (2 + counter) - 1;",
+    'print "line {i}";',
+    "if (value_{j} > {i}) {{ counter = counter + 1; }} else {{ counter = 0; }}",
+    "while (counter < {i}) counter = counter + value_{j};",
+    "{{ var local = value_{j}; local = local / 2; }}",
+]
+
+
+def generate(lines: int) -> str:
+    return "\n".join(
+        LINES[i % len(LINES)].format(i=i, j=max(i - 5, 0)) for i in range(lines)
+    )
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+@click.command()
+@click.option("--lines", default=100_000, show_default=True)
+def main(lines):
+    source = generate(lines)
+    lox = Lox()
+
+    tracemalloc.start()
+    start = traced()
+    tokens = FastScanner(source, interpreter=lox).scan_tokens()
+    scanned = traced()
+    statements = Parser(tokens, interpreter=lox).parse()
+    parsed = traced()
+    token_array = ArrayScanner(source, interpreter=lox).scan_tokens()
+    scanned_array = traced()
+    tracemalloc.stop()
+
+    # The AST keeps some tokens alive (names, operators); they are counted
+    # with the tokens, so the node figure covers the node objects only.
+    nodes = sum(count_nodes(statement) for statement in statements)
+    click.echo(
+        f"tokens  {len(tokens):>9}  {(scanned - start) / len(tokens):6.1f} B/token"
+    )
+    click.echo(
+        f"array   {len(token_array):>9}  "
+        f"{(scanned_array - parsed) / len(token_array):6.1f} B/token"
+    )
+    click.echo(f"nodes   {nodes:>9}  {(parsed - scanned) / nodes:6.1f} B/node")
+
+
+if __name__ == "__main__":
+    main()
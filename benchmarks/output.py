@@ -0,0 +1,83 @@
+"""Throughput of a print-heavy script with stdout on a pipe and on a terminal.
+
+"print" calls Python's `print()` per Lox `print`, as every engine did before
+output went through a sink; "buffered" is the default `BufferedSink`. Each
+run is a child process so stdout really is a pipe or a pseudo-terminal.
+"""
+
+from __future__ import annotations
+
+import os
+import pty
+import subprocess
+import sys
+import time
+
+import click
+
+from lox import Lox
+from output import BufferedSink
+
+
+class PrintSink:
+    def write(self, line: str):
+        print(line)
+
+    def flush(self):
+        pass
+
+
+SINKS = {"print": PrintSink, "buffered": BufferedSink}
+
+
+def workload(lines: int) -> str:
+    return f"for (var i = 0; i < {lines}; i = i + 1) print i;\n"
+
+
+def child(sink: str, lines: int):
+    lox = Lox(use_cache=False, output=SINKS[sink]())
+    start = time.perf_counter()
+    lox.run(workload(lines))
+    print(time.perf_counter() - start, file=sys.stderr)
+
+
+def run_child(sink: str, lines: int, terminal: bool) -> float:
+    args = [sys.executable, "-m", "benchmarks.output", "--child", sink]
+    args += ["--lines", str(lines)]
+    if not terminal:
+        result = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return float(result.stderr)
+
+    controller, worker = pty.openpty()
+    process = subprocess.Popen(args, stdout=worker, stderr=subprocess.PIPE)
+    os.close(worker)
+    try:
+        while os.read(controller, 65536):
+            pass
+    except OSError:
+        # Reading a pseudo-terminal whose other end closed raises EIO.
+        pass
+    os.close(controller)
+    return float(process.communicate()[1])
+
+
+@click.command()
+@click.option("--lines", default=200_000, show_default=True)
+@click.option("--repeat", default=3, show_default=True)
+@click.option("--child", "child_sink", type=click.Choice(list(SINKS)), hidden=True)
+def main(lines, repeat, child_sink):
+    if child_sink:
+        child(child_sink, lines)
+        return
+
+    for terminal in (False, True):
+        target = "terminal" if terminal else "pipe"
+        for sink in SINKS:
+            best = min(run_child(sink, lines, terminal) for _ in range(repeat))
+            click.echo(
+                f"{target:<8} {sink:<8} {best:6.3f}s  {lines / best:10.0f} lines/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Time to first output for whole-program versus pipelined execution."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+import time
+
+import click
+
+from lox import Lox
+
+MODES = {
+    "whole": {},
+    "pipeline": {"pipeline": True},
+    "pipeline+stream": {"pipeline": True, "stream": True},
+}
+
+
+class FirstWrite:
+    """Discards output but remembers when the first write happened."""
+
+    def __init__(self):
+        self.first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+
+    def flush(self):
+        pass
+
+
+def generate(lines: int) -> str:
+    body = "".join(f"var v{i} = {i} * 2 + 1;\nv{i} = v{i} - 1;\n" for i in range(lines))
+    return 'print "started";\n' + body + 'print "done";\n'
+
+
+@click.command()
+@click.option("--lines", default=20_000, show_default=True)
+def main(lines):
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "generated.lox")
+        with open(script, "w") as f:
+            f.write(generate(lines))
+
+        for name, options in MODES.items():
+            output = FirstWrite()
+            lox = Lox(use_cache=False, scanner="fast", **options)
+            with contextlib.redirect_stdout(output):
+                start = time.perf_counter()
+                lox.run_file(script)
+                total = time.perf_counter() - start
+
+            first = output.first - start
+            click.echo(f"{name:<16} first output {first:7.3f}s  total {total:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
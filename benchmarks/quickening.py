@@ -0,0 +1,69 @@
+"""Binary operators: quickened nodes vs. the generic `match` on every run.
+
+"generic" always takes `Interpreter.binary_operation`, as every `Binary`
+node did before quickening; "quickened" is the current interpreter. The
+loop is dominated by arithmetic and comparisons. Setups are interleaved so
+machine drift hits both.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import run_source
+from interpreter import Interpreter
+from lox import Lox
+
+
+# noinspection PyShadowingNames
+class GenericInterpreter(Interpreter):
+    def visit_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        return self.binary_operation(expr, left, right)
+
+
+def workload(iterations: int) -> str:
+    return (
+        "var total = 0;\n"
+        'var label = "";\n'
+        f"for (var i = 0; i < {iterations}; i = i + 1) {{\n"
+        "  if (i * 3 - 1 >= total / 1000) total = total + i * 2;\n"
+        "  else total = total - 1;\n"
+        '  if (i == 7) label = label + "x";\n'
+        "}\n"
+        "print total;\n"
+    )
+
+
+def generic() -> Lox:
+    lox = Lox(use_cache=False)
+    lox.interpreter = GenericInterpreter(lox)
+    return lox
+
+
+SETUPS = {"generic": generic, "quickened": lambda: Lox(use_cache=False)}
+
+
+@click.command()
+@click.option("--iterations", default=50_000, show_default=True)
+@click.option("--repeat", default=10, show_default=True)
+def main(iterations, repeat):
+    source = workload(iterations)
+    times = {name: [] for name in SETUPS}
+    for repetition in range(repeat):
+        names = list(SETUPS) if repetition % 2 else list(SETUPS)[::-1]
+        for name in names:
+            times[name].append(run_source(source, SETUPS[name]()))
+
+    baseline = min(times["generic"])
+    for name, samples in times.items():
+        best = min(samples)
+        click.echo(
+            f"{name:<9} best {best:7.3f}s  "
+            f"{(baseline - best) / baseline * 100:5.1f}% faster than generic"
+        )
+
+
+if __name__ == "__main__":
+    main()
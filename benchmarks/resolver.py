@@ -0,0 +1,46 @@
+"""Variable access cost as a function of block nesting depth.
+
+Before the resolver every access walked the `Environment` chain with a dict
+lookup per level, so the time grew with the nesting depth. With slot-indexed
+frames it should stay roughly flat.
+"""
+
+from __future__ import annotations
+
+import click
+
+from benchmarks.common import best_of, run_source
+
+
+def nested_loop(depth: int, iterations: int) -> str:
+    source = "{ var total = 0; var i = 0;\n"
+    source += "{ var pad; " * depth
+    source += f"while (i < {iterations}) {{ total = total + i; i = i + 1; }}\n"
+    source += "}" * depth
+    source += "print total; }\n"
+    return source
+
+
+def fib(iterations: int) -> str:
+    return (
+        "var a = 0; var temp;\n"
+        f"for (var b = 1; b < {iterations}; b = b + 1) {{\n"
+        "  temp = a; a = b; a = temp;\n"
+        "}\n"
+    )
+
+
+@click.command()
+@click.option("--iterations", default=100_000, show_default=True)
+@click.option("--repeat", default=3, show_default=True)
+def main(iterations, repeat):
+    for depth in (0, 4, 16, 64):
+        elapsed = best_of(repeat, run_source, nested_loop(depth, iterations))
+        click.echo(f"nested depth={depth:<3} {elapsed:8.3f}s")
+
+    elapsed = best_of(repeat, run_source, fib(iterations))
+    click.echo(f"fib-style loop    {elapsed:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
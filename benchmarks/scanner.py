@@ -0,0 +1,56 @@
+"""Scanner throughput in MB/s on synthetic sources of increasing size."""
+
+from __future__ import annotations
+
+import gc
+import random
+import time
+
+import click
+
+from lox import SCANNERS, Lox
+
+SNIPPETS = [
+    "var counter_{i} = {i}.5;\n",
+    'print "line {i} of the generated program";\n',
+    "if (counter_{i} >= 10 and !done) {{ total = total + counter_{i} * 2; }}\n",
+    "// a comment explaining step {i}\n",
+    "while (i < {i}) {{ i = i + 1; }}\n",
+]
+
+
+def generate(size: int) -> str:
+    rng = random.Random(size)
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        part = rng.choice(SNIPPETS).format(i=i)
+        parts.append(part)
+        length += len(part)
+        i += 1
+    return "".join(parts)
+
+
+@click.command()
+@click.option("--max-mb", default=8, show_default=True)
+def main(max_mb):
+    size = 125_000
+    while size <= max_mb * 1_000_000:
+        source = generate(size)
+        results = []
+        for name, scanner in SCANNERS.items():
+            gc.collect()
+            start = time.perf_counter()
+            tokens = scanner(source, interpreter=Lox()).scan_tokens()
+            elapsed = time.perf_counter() - start
+            results.append(f"{name} {len(source) / 1e6 / elapsed:6.2f} MB/s")
+        click.echo(
+            f"{len(source) / 1e6:6.2f} MB {len(tokens):>9} tokens  "
+            + "  ".join(results)
+        )
+        size *= 2
+
+
+if __name__ == "__main__":
+    main()
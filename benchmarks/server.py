@@ -0,0 +1,101 @@
+"""Latency of a short script: a fresh `lox.py` process vs. the evaluation server.
+
+"cold" starts `lox.py` per request, "client" starts `client.py` per request
+against a running `lox.py serve`, and "in-process" sends requests over open
+connections from `--clients` threads at once, leaving only the server's own
+latency and the socket round trip.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import click
+
+from client import request
+
+SCRIPT = """
+var total = 0;
+for (var i = 0; i < 50; i = i + 1) total = total + i;
+print total;
+"""
+
+
+def timed_process(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def summary(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms"
+
+
+@click.command()
+@click.option("--requests", default=20, show_default=True)
+@click.option("--clients", default=8, show_default=True)
+def main(requests, clients):
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "script.lox")
+        path = os.path.join(directory, "lox.sock")
+        with open(script, "w") as file:
+            file.write(SCRIPT)
+
+        server = subprocess.Popen(
+            [sys.executable, "lox.py", "serve", "--socket", path, "--quiet"],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.05)
+
+            cold = [
+                timed_process([sys.executable, "lox.py", "--no-cache", script])
+                for _ in range(requests)
+            ]
+            client = [
+                timed_process([sys.executable, "client.py", "--socket", path, script])
+                for _ in range(requests)
+            ]
+            in_process = run_clients(path, clients, requests * 10)
+        finally:
+            server.terminate()
+            server.wait()
+
+    click.echo(f"cold       {summary(cold)}")
+    click.echo(f"client     {summary(client)}")
+    click.echo(f"in-process {summary(in_process)}  ({clients} concurrent clients)")
+
+
+def run_clients(path: str, clients: int, requests: int) -> list[float]:
+    samples = []
+
+    def client():
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(path)
+            for _ in range(requests // clients):
+                start = time.perf_counter()
+                request(path, {"source": SCRIPT}, lambda line: None, sock)
+                samples.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return samples
+
+
+if __name__ == "__main__":
+    main()
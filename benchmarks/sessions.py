@@ -0,0 +1,82 @@
+"""Load test: hundreds of concurrent sessions, a few of them running long loops.
+
+Interactive sessions send short snippets with a little think time between
+them and record how long each one takes to answer; the heavy sessions each
+run one long loop. Without cooperative yielding ("never") every short
+snippet that arrives during a loop waits for the whole loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import time
+
+import click
+
+from sessions import Session
+
+SHORT = "var n = n + 1; if (n > 2) print n; else print -n;"
+LONG = "var i = 0; while (i < {iterations}) {{ i = i + 1; }} print i;"
+
+
+async def discard(line: str):
+    pass
+
+
+async def interactive(session: Session, snippets: int, latencies: list[float]):
+    await session.run("var n = 0;")
+    for _ in range(snippets):
+        think = random.uniform(0, 0.05)
+        # Measured from when the user meant to send the snippet, so time
+        # spent waiting for a blocked event loop to wake us up counts too.
+        sent = time.perf_counter() + think
+        await asyncio.sleep(think)
+        await session.run(SHORT)
+        latencies.append(time.perf_counter() - sent)
+
+
+async def heavy_loop(session: Session, iterations: int):
+    # Start somewhere while the interactive sessions are busy.
+    await asyncio.sleep(random.uniform(0, 0.3))
+    await session.run(LONG.format(iterations=iterations))
+
+
+async def load(sessions: int, heavy: int, snippets: int, iterations: int, every):
+    latencies = []
+    tasks = []
+    for _ in range(heavy):
+        tasks.append(heavy_loop(Session(discard, every), iterations))
+    for _ in range(sessions - heavy):
+        session = Session(discard, every)
+        tasks.append(interactive(session, snippets, latencies))
+
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--sessions", default=300, show_default=True)
+@click.option("--heavy", default=5, show_default=True)
+@click.option("--snippets", default=20, show_default=True)
+@click.option("--iterations", default=20_000, show_default=True)
+def main(sessions, heavy, snippets, iterations):
+    for every in (None, 1000, 100, 10):
+        random.seed(0)
+        latencies, elapsed = asyncio.run(
+            load(sessions, heavy, snippets, iterations, every)
+        )
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        click.echo(
+            f"yield every {str(every or 'never'):>5}  p50 {p50 * 1000:8.2f} ms  "
+            f"p99 {p99 * 1000:8.2f} ms  max {latencies[-1] * 1000:8.2f} ms  "
+            f"total {elapsed:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
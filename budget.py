@@ -0,0 +1,75 @@
+"""Step and wall-clock budgets that stop runaway scripts."""
+
+from __future__ import annotations
+
+import time
+import typing
+from typing import Optional
+
+import stmt
+from exceptions import LoxBudgetExceeded
+from interpreter import Interpreter
+
+if typing.TYPE_CHECKING:
+    import lox
+
+# Statements between two checks of the clock.
+CHECK_EVERY = 1000
+
+
+class BudgetedInterpreter(Interpreter):
+    """`Interpreter` that raises `LoxBudgetExceeded` once it has executed
+    `max_steps` statements or run for `timeout` seconds.
+
+    `execute` only decrements a countdown; the step total and the clock are
+    looked at once the countdown runs out, every `CHECK_EVERY` statements.
+    The budget covers everything run until `reset_budget`, and the clock
+    starts with the first statement.
+    """
+
+    def __init__(
+        self,
+        interpreter: lox.Lox,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        super().__init__(interpreter)
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.reset_budget()
+
+    def reset_budget(self):
+        self.steps = 0
+        self.chunk = 0
+        self.countdown = 0
+        self.deadline: Optional[float] = None
+
+    def execute(self, stmt: stmt.Stmt):
+        if self.countdown:
+            self.countdown -= 1
+        else:
+            self.check_budget(stmt)
+        stmt.accept(self)
+
+    def check_budget(self, stmt: stmt.Stmt):
+        # The previous chunk has been used up completely.
+        self.steps += self.chunk
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            raise LoxBudgetExceeded(
+                stmt.line, f"Step budget of {self.max_steps} exceeded."
+            )
+
+        if self.timeout is not None:
+            now = time.monotonic()
+            if self.deadline is None:
+                self.deadline = now + self.timeout
+            elif now >= self.deadline:
+                raise LoxBudgetExceeded(
+                    stmt.line, f"Time budget of {self.timeout:g}s exceeded."
+                )
+
+        self.chunk = CHECK_EVERY
+        if self.max_steps is not None:
+            self.chunk = min(self.chunk, self.max_steps - self.steps)
+        # This statement is the first of the new chunk.
+        self.countdown = self.chunk - 1
@@ -0,0 +1,264 @@
+"""On-disk cache of parsed programs, in the spirit of `__pycache__`.
+
+The statements produced by `Scanner` + `Parser` are flattened in pre-order
+into one `array` of unsigned ints: a tag per node followed by its fields,
+with tokens stored as (type, lexeme index, line), statements carrying their
+line (0 for none) and every lexeme or literal kept once in a constant pool.
+The zlib-compressed array and the pool are written with `marshal`, which
+keeps the scanners' interned names interned when they are loaded. Each
+script gets one cache file in a `__loxcache__` directory next to it; the file
+records a format version and a hash of the source, and is ignored when either
+differs.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import zlib
+from array import array
+from typing import Optional
+
+import expr
+import stmt
+from tokens import Token, TokenType
+
+CACHE_DIR = "__loxcache__"
+# Bump whenever the encoding below or the AST classes change shape.
+FORMAT_VERSION = 3
+
+_TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+
+
+class _Tag:
+    NONE = 0
+    BINARY = 1
+    GROUPING = 2
+    LITERAL = 3
+    UNARY = 4
+    VARIABLE = 5
+    ASSIGN = 6
+    LOGICAL = 7
+    EXPRESSION = 8
+    PRINT = 9
+    VAR = 10
+    BLOCK = 11
+    IF = 12
+    WHILE = 13
+
+
+def cache_path(script: str) -> str:
+    directory, name = os.path.split(os.path.abspath(script))
+    tag = sys.implementation.cache_tag
+    return os.path.join(directory, CACHE_DIR, f"{name}.{tag}.loxc")
+
+
+def source_hash(source: str) -> bytes:
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+def load(script: str, source: str) -> Optional[list[stmt.Stmt]]:
+    """Return the cached statements for `script`, or None on a miss."""
+    try:
+        with open(cache_path(script), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    # Decoding allocates one object per node; pausing the cyclic collector
+    # keeps it from repeatedly scanning the growing, garbage-free tree.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        version, digest, codes, constants = marshal.loads(data)
+        if version != FORMAT_VERSION or digest != source_hash(source):
+            return None
+
+        return _Decoder(zlib.decompress(codes), constants).decode()
+    except (EOFError, IndexError, KeyError, ValueError, TypeError, zlib.error):
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def store(script: str, source: str, statements: list[stmt.Stmt]):
+    """Write `statements` to the cache, silently giving up on any failure."""
+    path = cache_path(script)
+    try:
+        encoder = _Encoder()
+        encoder.encode(statements)
+        data = marshal.dumps(
+            (
+                FORMAT_VERSION,
+                source_hash(source),
+                zlib.compress(encoder.codes.tobytes(), 1),
+                tuple(encoder.constants),
+            )
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a
+        # partially written cache.
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except (OSError, ValueError, OverflowError, RecursionError):
+        pass
+
+
+class _Encoder:
+    def __init__(self):
+        self.codes = array("I")
+        self.constants: list = []
+        self.constant_index: dict = {}
+
+    def encode(self, statements: list[stmt.Stmt]):
+        self.codes.append(len(statements))
+        for statement in statements:
+            self.node(statement)
+
+    def constant(self, value) -> int:
+        # Keyed by type as well, since 1.0 == True would otherwise collide.
+        key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+
+        return self.constant_index[key]
+
+    def token(self, token: Token):
+        # Only operator and name tokens end up in the AST, so the literal is
+        # always None and is not stored.
+        self.codes.extend((token.type.value, self.constant(token.lexeme), token.line))
+
+    def node(self, node):
+        codes = self.codes
+        match node:
+            case None:
+                codes.append(_Tag.NONE)
+            case expr.Binary():
+                codes.append(_Tag.BINARY)
+                self.node(node.left)
+                self.token(node.operator)
+                self.node(node.right)
+            case expr.Grouping():
+                codes.append(_Tag.GROUPING)
+                self.node(node.expression)
+            case expr.Literal():
+                codes.extend((_Tag.LITERAL, self.constant(node.value)))
+            case expr.Unary():
+                codes.append(_Tag.UNARY)
+                self.token(node.operator)
+                self.node(node.right)
+            case expr.Variable():
+                codes.append(_Tag.VARIABLE)
+                self.token(node.name)
+            case expr.Assign():
+                codes.append(_Tag.ASSIGN)
+                self.token(node.name)
+                self.node(node.value)
+            case expr.Logical():
+                codes.append(_Tag.LOGICAL)
+                self.node(node.left)
+                self.token(node.operator)
+                self.node(node.right)
+            case stmt.Expression():
+                codes.extend((_Tag.EXPRESSION, node.line or 0))
+                self.node(node.expression)
+            case stmt.Print():
+                codes.extend((_Tag.PRINT, node.line or 0))
+                self.node(node.expression)
+            case stmt.Var():
+                codes.extend((_Tag.VAR, node.line or 0))
+                self.token(node.name)
+                self.node(node.initializer)
+            case stmt.Block():
+                codes.extend((_Tag.BLOCK, node.line or 0, len(node.statements)))
+                for statement in node.statements:
+                    self.node(statement)
+            case stmt.If():
+                codes.extend((_Tag.IF, node.line or 0))
+                self.node(node.condition)
+                self.node(node.then_branch)
+                self.node(node.else_branch)
+            case stmt.While():
+                codes.extend((_Tag.WHILE, node.line or 0))
+                self.node(node.condition)
+                self.node(node.body)
+            case _:
+                raise ValueError(f"Cannot cache {type(node).__name__} nodes")
+
+
+class _Decoder:
+    def __init__(self, codes: bytes, constants: tuple):
+        self.codes = iter(array("I", codes).tolist())
+        self.constants = constants
+
+    def decode(self) -> list[stmt.Stmt]:
+        return [self.node() for _ in range(next(self.codes))]
+
+    def token(self) -> Token:
+        codes = self.codes
+        token_type = _TOKEN_TYPES[next(codes)]
+        lexeme = self.constants[next(codes)]
+        return Token(token_type, lexeme, None, next(codes))
+
+    def line(self) -> Optional[int]:
+        return next(self.codes) or None
+
+    def node(self):
+        # Children are decoded in the order the encoder wrote them, so they
+        # are bound to locals before the node itself is constructed.
+        tag = next(self.codes)
+        match tag:
+            case _Tag.NONE:
+                return None
+            case _Tag.BINARY:
+                left = self.node()
+                operator = self.token()
+                return expr.Binary(left, operator, self.node())
+            case _Tag.GROUPING:
+                return expr.Grouping(self.node())
+            case _Tag.LITERAL:
+                return expr.Literal(self.constants[next(self.codes)])
+            case _Tag.UNARY:
+                operator = self.token()
+                return expr.Unary(operator, self.node())
+            case _Tag.VARIABLE:
+                return expr.Variable(self.token())
+            case _Tag.ASSIGN:
+                name = self.token()
+                return expr.Assign(name, self.node())
+            case _Tag.LOGICAL:
+                left = self.node()
+                operator = self.token()
+                return expr.Logical(left, operator, self.node())
+            case _Tag.EXPRESSION:
+                line = self.line()
+                return stmt.Expression(self.node(), line)
+            case _Tag.PRINT:
+                line = self.line()
+                return stmt.Print(self.node(), line)
+            case _Tag.VAR:
+                line = self.line()
+                name = self.token()
+                return stmt.Var(name, self.node(), line)
+            case _Tag.BLOCK:
+                line = self.line()
+                count = next(self.codes)
+                return stmt.Block([self.node() for _ in range(count)], line)
+            case _Tag.IF:
+                line = self.line()
+                condition = self.node()
+                then_branch = self.node()
+                return stmt.If(condition, then_branch, self.node(), line)
+            case _Tag.WHILE:
+                line = self.line()
+                condition = self.node()
+                return stmt.While(condition, self.node(), line)
+
+        raise ValueError(f"Unknown cache tag {tag}")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from array import array
+
+from tokens import Token
+
+# Opcodes are plain ints so the VM can compare them without enum overhead.
+# Instructions listed with an operand are followed by one extra code word.
+OP_CONSTANT = 0  # constant index
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5  # slot
+OP_SET_LOCAL = 6  # slot
+OP_GET_GLOBAL = 7  # constant index of the name
+OP_SET_GLOBAL = 8  # constant index of the name
+OP_DEFINE_GLOBAL = 9  # constant index of the name
+OP_EQUAL = 10
+OP_NOT_EQUAL = 11
+OP_GREATER = 12
+OP_GREATER_EQUAL = 13
+OP_LESS = 14
+OP_LESS_EQUAL = 15
+OP_ADD = 16
+OP_SUBTRACT = 17
+OP_MULTIPLY = 18
+OP_DIVIDE = 19
+OP_NOT = 20
+OP_NEGATE = 21
+OP_PRINT = 22
+OP_JUMP = 23  # absolute target
+OP_JUMP_IF_FALSE = 24  # absolute target, leaves the condition on the stack
+OP_POP_JUMP_IF_FALSE = 25  # absolute target, pops the condition
+OP_JUMP_IF_TRUE = 26  # absolute target, leaves the condition on the stack
+OP_SET_LOCAL_POP = 27  # slot
+OP_SET_GLOBAL_POP = 28  # constant index of the name
+OP_RETURN = 29
+
+
+class Chunk:
+    """A compiled program: flat code words, a constant pool and error tokens.
+
+    Only instructions that can raise a runtime error record their source
+    token, keyed by the offset of the opcode, which keeps the common case
+    free of per-instruction line bookkeeping.
+    """
+
+    def __init__(self):
+        self.code = array("I")
+        self.constants: list = []
+        self.tokens: dict[int, Token] = {}
+        self.local_count = 0
+        self._constant_index: dict = {}
+
+    def write(self, op: int, operand: int = None, token: Token = None) -> int:
+        offset = len(self.code)
+        self.code.append(op)
+        if operand is not None:
+            self.code.append(operand)
+        if token is not None:
+            self.tokens[offset] = token
+
+        return offset
+
+    def add_constant(self, value) -> int:
+        # Keyed by type as well, since 1.0 == True would otherwise share a
+        # slot, and floats by repr, since -0.0 == 0.0 would too.
+        key = (type(value), repr(value) if type(value) is float else value)
+        if key not in self._constant_index:
+            self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+
+        return self._constant_index[key]
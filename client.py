@@ -0,0 +1,82 @@
+"""Thin client for `lox.py serve`: run a script on the server, print its output.
+
+    python client.py script.lox
+    echo 'print 1 + 2;' | python client.py
+
+Only the standard library is imported, so the client starts in a fraction
+of the time `lox.py` needs. The exit status is the one `lox.py` would use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Callable, Optional
+
+DEFAULT_SOCKET = "/tmp/lox.sock"
+
+
+def request(
+    path: str,
+    message: dict,
+    output: Callable[[str], None] = print,
+    sock: Optional[socket.socket] = None,
+) -> dict:
+    """Send one request, pass each output line to `output` as it arrives and
+    return the final status message.
+
+    An open `sock` is reused, so several requests can share a connection.
+    """
+    connection = sock or socket.socket(socket.AF_UNIX)
+    try:
+        if sock is None:
+            connection.connect(path)
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        with connection.makefile("rb") as reader:
+            for line in reader:
+                response = json.loads(line)
+                if "output" not in response:
+                    return response
+                output(response["output"])
+    finally:
+        if sock is None:
+            connection.close()
+
+    raise ConnectionError("Server closed the connection mid-request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", nargs="?", help="Script to run; stdin if omitted.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument(
+        "--server-path",
+        action="store_true",
+        help="Let the server read SCRIPT instead of sending its source.",
+    )
+    parser.add_argument(
+        "--latency", action="store_true", help="Report the request latency."
+    )
+    args = parser.parse_args()
+
+    if args.script is None:
+        message = {"source": sys.stdin.read()}
+    elif args.server_path:
+        message = {"path": os.path.abspath(args.script)}
+    else:
+        with open(args.script) as file:
+            message = {"source": file.read()}
+
+    response = request(args.socket, message)
+    for error in response["errors"]:
+        print(error, file=sys.stderr)
+    if args.latency:
+        print(f"server {response['elapsed'] * 1000:.1f} ms", file=sys.stderr)
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import typing
+
+import expr
+import stmt
+from environment import Environment
+from exceptions import (
+    OPERAND_MUST_BE_A_NUMBER,
+    OPERANDS_MUST_BE_NUMBERS,
+    OPERANDS_MUST_BE_NUMBERS_OR_STRINGS,
+    LoxRuntimeError,
+)
+from tokens import TokenType
+from visitor import Visitor
+
+if typing.TYPE_CHECKING:
+    import lox
+
+
+def _stringify(value):
+    if value is None:
+        return "nil"
+
+    return str(value)
+
+
+# noinspection PyShadowingNames
+class ClosureCompiler(Visitor):
+    """Turns the resolved AST into a tree of specialized Python closures.
+
+    Every compiled node is a function of the current frame. A frame is a list
+    whose first item is the enclosing frame and whose remaining items are the
+    block's slots, as numbered by the `Resolver`; the top level runs with no
+    frame at all. Globals live in the dict of a regular `Environment`.
+    """
+
+    def __init__(self, globals: Environment, print_=print):
+        self.globals = globals
+        self.print = print_
+
+    def compile(self, statements: list[stmt.Stmt]):
+        return [self.compile_stmt(statement) for statement in statements]
+
+    def compile_stmt(self, stmt: stmt.Stmt):
+        return stmt.accept(self)
+
+    def compile_expr(self, expr: expr.Expr):
+        return expr.accept(self)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        statements = tuple(self.compile(stmt.statements))
+        if not stmt.slot_count:
+            # Declares nothing, so the resolver gave it no scope either.
+
+            def block_in_place(frame):
+                for statement in statements:
+                    statement(frame)
+
+            return block_in_place
+
+        # Reused by every execution, as in `Interpreter.visit_block_stmt`.
+        inner = [None] * (stmt.slot_count + 1)
+
+        def block(frame):
+            inner[0] = frame
+            for statement in statements:
+                statement(inner)
+
+        return block
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        return self.compile_expr(stmt.expression)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+
+            def if_then(frame):
+                value = condition(frame)
+                if value is not None and value is not False:
+                    then_branch(frame)
+
+            return if_then
+
+        else_branch = self.compile_stmt(stmt.else_branch)
+
+        def if_then_else(frame):
+            value = condition(frame)
+            if value is not None and value is not False:
+                then_branch(frame)
+            else:
+                else_branch(frame)
+
+        return if_then_else
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        expression = self.compile_expr(stmt.expression)
+        output = self.print
+
+        def print_(frame):
+            output(_stringify(expression(frame)))
+
+        return print_
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer is not None:
+            initializer = self.compile_expr(stmt.initializer)
+        else:
+            initializer = self.visit_literal_expr(expr.Literal(None))
+
+        if stmt.depth is None:
+            values = self.globals.values
+            name = stmt.name.lexeme
+
+            def define_global(frame):
+                values[name] = initializer(frame)
+
+            return define_global
+
+        index = stmt.slot + 1
+
+        def define_local(frame):
+            frame[index] = initializer(frame)
+
+        return define_local
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        condition = self.compile_expr(stmt.condition)
+        body = self.compile_stmt(stmt.body)
+
+        def while_(frame):
+            while True:
+                value = condition(frame)
+                if value is None or value is False:
+                    return
+                body(frame)
+
+        return while_
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        value = expr.value
+
+        def literal(frame):
+            return value
+
+        return literal
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        return self.compile_expr(expr.expression)
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.MINUS:
+
+            def negate(frame):
+                value = right(frame)
+                if type(value) is not float:
+                    raise LoxRuntimeError(operator, OPERANDS_MUST_BE_NUMBERS)
+                return -value
+
+            return negate
+
+        def not_(frame):
+            value = right(frame)
+            return value is None or value is False
+
+        return not_
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+
+            def or_(frame):
+                value = left(frame)
+                if value is not None and value is not False:
+                    return value
+                return right(frame)
+
+            return or_
+
+        def and_(frame):
+            value = left(frame)
+            if value is None or value is False:
+                return value
+            return right(frame)
+
+        return and_
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        if expr.depth is None:
+            values = self.globals.values
+            name = expr.name
+
+            def get_global(frame):
+                try:
+                    return values[name.lexeme]
+                except KeyError:
+                    raise LoxRuntimeError(
+                        name, f"Undefined variable '{name.lexeme}'"
+                    ) from None
+
+            return get_global
+
+        index = expr.slot + 1
+        depth = expr.depth
+
+        if depth == 0:
+
+            def get_local(frame):
+                return frame[index]
+
+            return get_local
+
+        if depth == 1:
+
+            def get_parent(frame):
+                return frame[0][index]
+
+            return get_parent
+
+        def get_ancestor(frame):
+            for _ in range(depth):
+                frame = frame[0]
+            return frame[index]
+
+        return get_ancestor
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        value_of = self.compile_expr(expr.value)
+
+        if expr.depth is None:
+            values = self.globals.values
+            name = expr.name
+
+            def set_global(frame):
+                value = value_of(frame)
+                if name.lexeme not in values:
+                    raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+                values[name.lexeme] = value
+                return value
+
+            return set_global
+
+        index = expr.slot + 1
+        depth = expr.depth
+
+        if depth == 0:
+
+            def set_local(frame):
+                frame[index] = value = value_of(frame)
+                return value
+
+            return set_local
+
+        def set_ancestor(frame):
+            value = value_of(frame)
+            for _ in range(depth):
+                frame = frame[0]
+            frame[index] = value
+            return value
+
+        return set_ancestor
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+
+        match operator.type:
+            case TokenType.PLUS:
+
+                def add(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if (type(a) is float and type(b) is float) or (
+                        type(a) is str and type(b) is str
+                    ):
+                        return a + b
+                    raise LoxRuntimeError(operator, OPERANDS_MUST_BE_NUMBERS_OR_STRINGS)
+
+                return add
+            case TokenType.MINUS:
+
+                def subtract(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a - b
+
+                return subtract
+            case TokenType.STAR:
+
+                def multiply(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a * b
+
+                return multiply
+            case TokenType.SLASH:
+
+                def divide(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a / b
+
+                return divide
+            case TokenType.GREATER:
+
+                def greater(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a > b
+
+                return greater
+            case TokenType.GREATER_EQUAL:
+
+                def greater_equal(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a >= b
+
+                return greater_equal
+            case TokenType.LESS:
+
+                def less(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a < b
+
+                return less
+            case TokenType.LESS_EQUAL:
+
+                def less_equal(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if type(a) is not float or type(b) is not float:
+                        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
+                    return a <= b
+
+                return less_equal
+            case TokenType.EQUAL_EQUAL:
+
+                def equal(frame):
+                    return left(frame) == right(frame)
+
+                return equal
+            case TokenType.BANG_EQUAL:
+
+                def not_equal(frame):
+                    return not left(frame) == right(frame)
+
+                return not_equal
+
+
+class ClosureInterpreter:
+    """Execution engine that compiles each program to closures once."""
+
+    def __init__(self, interpreter: lox.Lox):
+        self.interpreter = interpreter
+        self.globals = Environment()
+        self.print = print
+
+    def reset_globals(self, names: dict[str, int]):
+        self.globals = Environment()
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        compiled = ClosureCompiler(self.globals, self.print).compile(statements)
+        try:
+            for statement in compiled:
+                statement(None)
+        except LoxRuntimeError as error:
+            self.interpreter.runtime_error(error)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import expr
+import stmt
+from chunk import (
+    Chunk,
+    OP_ADD,
+    OP_CONSTANT,
+    OP_DEFINE_GLOBAL,
+    OP_DIVIDE,
+    OP_EQUAL,
+    OP_FALSE,
+    OP_GET_GLOBAL,
+    OP_GET_LOCAL,
+    OP_GREATER,
+    OP_GREATER_EQUAL,
+    OP_JUMP,
+    OP_JUMP_IF_FALSE,
+    OP_JUMP_IF_TRUE,
+    OP_LESS,
+    OP_LESS_EQUAL,
+    OP_MULTIPLY,
+    OP_NEGATE,
+    OP_NIL,
+    OP_NOT,
+    OP_NOT_EQUAL,
+    OP_POP,
+    OP_POP_JUMP_IF_FALSE,
+    OP_PRINT,
+    OP_RETURN,
+    OP_SET_GLOBAL,
+    OP_SET_GLOBAL_POP,
+    OP_SET_LOCAL,
+    OP_SET_LOCAL_POP,
+    OP_SUBTRACT,
+    OP_TRUE,
+)
+from tokens import TokenType
+from visitor import Visitor
+
+BINARY_OPS = {
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+}
+
+
+# noinspection PyShadowingNames
+class Compiler(Visitor):
+    """Lowers parsed statements into a `Chunk` for the `VM`.
+
+    There are no functions, so every local lives in one flat frame of
+    registers. A block's locals get the next free registers and release them
+    again when the block ends.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+        self.scopes: list[dict[str, int]] = []
+        self.local_count = 0
+
+    def compile(self, statements: list[stmt.Stmt]) -> Chunk:
+        for statement in statements:
+            self.compile_stmt(statement)
+
+        self.emit(OP_RETURN)
+        return self.chunk
+
+    def compile_stmt(self, stmt: stmt.Stmt):
+        stmt.accept(self)
+
+    def compile_expr(self, expr: expr.Expr):
+        expr.accept(self)
+
+    def emit(self, op: int, operand: int = None, token=None) -> int:
+        return self.chunk.write(op, operand, token)
+
+    def emit_jump(self, op: int) -> int:
+        return self.emit(op, 0) + 1
+
+    def patch_jump(self, operand_offset: int):
+        self.chunk.code[operand_offset] = len(self.chunk.code)
+
+    def name_constant(self, name: str) -> int:
+        return self.chunk.add_constant(name)
+
+    def resolve_local(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+
+        return None
+
+    def declare_local(self, name: str) -> int:
+        scope = self.scopes[-1]
+        # Redeclaring a name in the same block overwrites the same register.
+        if name not in scope:
+            scope[name] = self.local_count
+            self.local_count += 1
+            self.chunk.local_count = max(self.chunk.local_count, self.local_count)
+
+        return scope[name]
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        self.scopes.append({})
+        for statement in stmt.statements:
+            self.compile_stmt(statement)
+        self.local_count -= len(self.scopes.pop())
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        expression = stmt.expression
+        if isinstance(expression, expr.Assign):
+            # Assignments used as statements store without leaving a value.
+            self.compile_assign(expression, OP_SET_LOCAL_POP, OP_SET_GLOBAL_POP)
+            return
+
+        self.compile_expr(expression)
+        self.emit(OP_POP)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.compile_expr(stmt.condition)
+        else_jump = self.emit_jump(OP_POP_JUMP_IF_FALSE)
+        self.compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit_jump(OP_JUMP)
+        self.patch_jump(else_jump)
+        self.compile_stmt(stmt.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.compile_expr(stmt.expression)
+        self.emit(OP_PRINT)
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer is not None:
+            self.compile_expr(stmt.initializer)
+        else:
+            self.emit(OP_NIL)
+
+        if not self.scopes:
+            self.emit(OP_DEFINE_GLOBAL, self.name_constant(stmt.name.lexeme))
+            return
+
+        # Declared after the initializer so `var a = a;` reads the outer `a`.
+        self.emit(OP_SET_LOCAL_POP, self.declare_local(stmt.name.lexeme))
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        loop_start = len(self.chunk.code)
+        self.compile_expr(stmt.condition)
+        exit_jump = self.emit_jump(OP_POP_JUMP_IF_FALSE)
+        self.compile_stmt(stmt.body)
+        self.emit(OP_JUMP, loop_start)
+        self.patch_jump(exit_jump)
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        if expr.value is None:
+            self.emit(OP_NIL)
+        elif expr.value is True:
+            self.emit(OP_TRUE)
+        elif expr.value is False:
+            self.emit(OP_FALSE)
+        else:
+            self.emit(OP_CONSTANT, self.chunk.add_constant(expr.value))
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        self.compile_expr(expr.expression)
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        self.compile_expr(expr.right)
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OP_NEGATE, token=expr.operator)
+        else:
+            self.emit(OP_NOT)
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        self.compile_expr(expr.left)
+        self.compile_expr(expr.right)
+        self.emit(BINARY_OPS[expr.operator.type], token=expr.operator)
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        self.compile_expr(expr.left)
+        if expr.operator.type == TokenType.OR:
+            end_jump = self.emit_jump(OP_JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+
+        self.emit(OP_POP)
+        self.compile_expr(expr.right)
+        self.patch_jump(end_jump)
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        slot = self.resolve_local(expr.name.lexeme)
+        if slot is not None:
+            self.emit(OP_GET_LOCAL, slot)
+        else:
+            self.emit(
+                OP_GET_GLOBAL, self.name_constant(expr.name.lexeme), token=expr.name
+            )
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        self.compile_assign(expr, OP_SET_LOCAL, OP_SET_GLOBAL)
+
+    def compile_assign(self, expr: expr.Assign, local_op: int, global_op: int):
+        self.compile_expr(expr.value)
+        slot = self.resolve_local(expr.name.lexeme)
+        if slot is not None:
+            self.emit(local_op, slot)
+        else:
+            self.emit(global_op, self.name_constant(expr.name.lexeme), token=expr.name)
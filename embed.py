@@ -0,0 +1,157 @@
+"""Embedding API: compile Lox source once, run it many times from Python.
+
+    engine = Engine()
+    program = engine.compile('print greeting + ", world";')
+    engine.run(program, {"greeting": "hello"})  # -> "hello, world\\n"
+
+Nothing is printed and nothing calls `exit()`: output is returned (or
+appended to a caller's list), syntax errors raise `LoxSyntaxError` and
+runtime errors raise the `LoxRuntimeError` that stopped the script.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import stmt
+from budget import BudgetedInterpreter
+from exceptions import LoxRuntimeError, LoxSyntaxError
+from lox import ENGINES, SCANNERS
+from optimizer import Optimizer
+from output import MemorySink
+from parser import Parser
+from resolver import Resolver
+from tokens import Token, TokenType
+
+
+class Program:
+    """A scanned, parsed and resolved script, ready to run any number of times.
+
+    The tree engine writes quickening hints into `Binary` nodes as it runs
+    (`Binary.specialized`); they are checked before every use and undone
+    when a run turns them off, so one program can still be shared by
+    concurrent and later runs. Nothing else in the statements changes.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        statements: list[stmt.Stmt],
+        global_slots: dict[str, int],
+    ):
+        self.source = source
+        self.statements = statements
+        # Global name -> slot, as numbered by the resolver for this program.
+        self.global_slots = global_slots
+
+
+class Reporter:
+    """Collects errors in place of `Lox`, which prints them and sets flags."""
+
+    def __init__(self):
+        self.errors: list[str] = []
+        self.runtime_error_raised: Optional[LoxRuntimeError] = None
+
+    def error(
+        self, line: Optional[int] = None, token: Optional[Token] = None, message=""
+    ):
+        if not token:
+            self.errors.append(f"[line {line}] Error : {message}")
+        elif token.type == TokenType.EOF:
+            self.errors.append(f"[line {token.line}] Error  at end: {message}")
+        else:
+            self.errors.append(
+                f"[line {token.line}] Error  at '{token.lexeme}': {message}"
+            )
+
+    def runtime_error(self, error: LoxRuntimeError):
+        self.runtime_error_raised = error
+
+
+class Engine:
+    """Compiles and runs Lox programs for a host application.
+
+    `engine` and `scanner` take the same names as the command line options.
+    Every `run` gets a fresh execution engine, so runs share nothing but the
+    globals dict a caller chooses to pass to several of them.
+
+    `max_steps` and `timeout` give every run its own budget, as the command
+    line options do; they need the tree engine.
+    """
+
+    def __init__(
+        self,
+        engine: str = "tree",
+        scanner: str = "fast",
+        optimize=False,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        if (max_steps is not None or timeout is not None) and engine != "tree":
+            raise ValueError("Budgets need the tree engine")
+
+        self.engine = ENGINES[engine]
+        self.scanner = SCANNERS[scanner]
+        self.optimize = optimize
+        self.max_steps = max_steps
+        self.timeout = timeout
+
+    def compile(
+        self, source: str, global_slots: Optional[dict[str, int]] = None
+    ) -> Program:
+        """Scan, parse and resolve `source`.
+
+        Programs that will run against one set of globals, e.g. the snippets
+        of a session, must share a `global_slots` table; by default every
+        program gets its own.
+        """
+        reporter = Reporter()
+        tokens = self.scanner(source, interpreter=reporter).scan_tokens()
+        statements = Parser(tokens, interpreter=reporter).parse()
+        if reporter.errors:
+            raise LoxSyntaxError(reporter.errors)
+
+        if self.optimize:
+            statements = Optimizer().optimize(statements)
+        resolver = Resolver(global_slots)
+        resolver.resolve(statements)
+        return Program(source, statements, resolver.globals)
+
+    def interpreter(self, reporter: Reporter):
+        """A new execution engine that reports to `reporter`."""
+        if self.max_steps is None and self.timeout is None:
+            return self.engine(interpreter=reporter)
+
+        return BudgetedInterpreter(reporter, self.max_steps, self.timeout)
+
+    def run(
+        self,
+        program: Program,
+        globals: Optional[dict] = None,
+        output: Optional[list[str]] = None,
+    ) -> str:
+        """Run `program` and return what it printed.
+
+        `globals` maps Lox global names to values (floats, strings, bools or
+        None); the script reads and updates it in place, and a fresh dict is
+        used when it is omitted. Printed lines are also appended to `output`
+        when given, which keeps them available if the script fails.
+        """
+        sink = MemorySink(output)
+        start = len(sink.lines)
+
+        reporter = Reporter()
+        engine = self.interpreter(reporter)
+        # A copy, since globals the program never mentions get slots too.
+        engine.reset_globals(dict(program.global_slots))
+        engine.globals.values = {} if globals is None else globals
+        engine.print = sink.write
+        engine.interpret(program.statements)
+        if globals is not None and engine.globals.values is not globals:
+            # The tree engine keeps globals in slots, not in the dict it got.
+            globals.update(engine.globals.values)
+
+        if reporter.runtime_error_raised is not None:
+            raise reporter.runtime_error_raised
+
+        return "".join(f"{line}\n" for line in sink.lines[start:])
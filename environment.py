@@ -4,6 +4,9 @@ from typing import Optional
 from exceptions import LoxRuntimeError
 from tokens import Token
 
+# Marks global slots whose variable has not been defined (yet).
+UNDEFINED = object()
+
 
 class Environment:
     enclosing: Optional[Environment] = None
@@ -13,8 +16,12 @@ class Environment:
         self.enclosing: Optional[Environment] = enclosing
 
     def get(self, name: Token):
-        if name.lexeme in self.values.keys():
-            return self.values.get(name.lexeme)
+        # One dict probe on the hit path; names are interned by the scanners,
+        # so the probe usually matches on identity alone.
+        try:
+            return self.values[name.lexeme]
+        except KeyError:
+            pass
 
         if self.enclosing is not None:
             return self.enclosing.get(name)
@@ -22,8 +29,9 @@ class Environment:
         raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
 
     def assign(self, name: Token, value: object):
-        if name.lexeme in self.values.keys():
-            self.values.update({name.lexeme: value})
+        values = self.values
+        if name.lexeme in values:
+            values[name.lexeme] = value
             return
 
         if self.enclosing is not None:
@@ -33,4 +41,104 @@ class Environment:
         raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
 
     def define(self, name: str, value: object):
-        self.values.update({name: value})
+        self.values[name] = value
+
+
+class GlobalEnvironment(Environment):
+    """Root scope whose variables live in a list indexed by global slot.
+
+    The resolver numbers global names in a `names` table (name -> slot) and
+    stores each global's slot on the nodes that use it, so a read is a list
+    index and an `UNDEFINED` check instead of a dict lookup. Programs must
+    be resolved against the `names` of the environment they run in; see
+    `Interpreter.reset_globals`. `values` still works as a dict for engines
+    and embedders that use one; reading it returns a snapshot and assigning
+    it replaces every global.
+    """
+
+    def __init__(self, names: Optional[dict[str, int]] = None):
+        # No `values` dict: it is a property here.
+        self.names: dict[str, int] = {} if names is None else names
+        self.slots: list = []
+        self.enclosing = None
+
+    @property
+    def values(self) -> dict:
+        slots = self.slots
+        return {
+            name: slots[slot]
+            for name, slot in self.names.items()
+            if slot < len(slots) and slots[slot] is not UNDEFINED
+        }
+
+    @values.setter
+    def values(self, values: dict):
+        self.slots = []
+        for name, value in values.items():
+            self.define(name, value)
+
+    def get(self, name: Token):
+        slot = self.names.get(name.lexeme, len(self.slots))
+        return self.get_slot(slot, name)
+
+    def assign(self, name: Token, value: object):
+        slot = self.names.get(name.lexeme, len(self.slots))
+        self.assign_slot(slot, name, value)
+
+    def define(self, name: str, value: object):
+        names = self.names
+        slot = names.get(name)
+        if slot is None:
+            slot = names[name] = len(names)
+        self.define_slot(slot, name, value)
+
+    def get_slot(self, slot: int, name: Token):
+        try:
+            value = self.slots[slot]
+        except IndexError:
+            value = UNDEFINED
+
+        if value is UNDEFINED:
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+        return value
+
+    def assign_slot(self, slot: int, name: Token, value: object):
+        slots = self.slots
+        if slot < len(slots) and slots[slot] is not UNDEFINED:
+            slots[slot] = value
+            return
+
+        raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+    def define_slot(self, slot: int, name: str, value: object):
+        slots = self.slots
+        if slot >= len(slots):
+            slots.extend([UNDEFINED] * (slot + 1 - len(slots)))
+        slots[slot] = value
+
+
+class SlotEnvironment:
+    """Block scope whose variables live in a fixed-size list.
+
+    The resolver assigns every local a `(depth, slot)` pair, so reading or
+    writing it is `depth` hops up the chain followed by a list index, without
+    any name lookups.
+    """
+
+    def __init__(self, enclosing, size: int):
+        self.slots: list = [None] * size
+        self.enclosing = enclosing
+
+    def ancestor(self, depth: int):
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing
+
+        return environment
+
+    def get_at(self, depth: int, slot: int):
+        return self.ancestor(depth).slots[slot]
+
+    def assign_at(self, depth: int, slot: int, value: object):
+        self.ancestor(depth).slots[slot] = value
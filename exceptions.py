@@ -1,7 +1,35 @@
 from __future__ import annotations
 
+from typing import Optional
+
+from tokens import Token, TokenType
+
 
 class LoxRuntimeError(Exception):
     def __init__(self, token, message):
         self.token = token
         self.message = message
+
+
+class LoxSyntaxError(Exception):
+    """Raised by the embedding API when a script fails to scan or parse."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+class LoxBudgetExceeded(LoxRuntimeError):
+    """Raised when a script runs out of its step or time budget."""
+
+    def __init__(self, line: Optional[int], message: str):
+        # Budgets are checked per statement, which has a line but no token.
+        super().__init__(Token(TokenType.EOF, "", None, line), message)
+
+
+# Runtime type error messages, shared so every engine reports the same text.
+# As in the original tree interpreter, unary minus reports the plural message
+# and the binary operators the singular one.
+OPERAND_MUST_BE_A_NUMBER = "Operand must be a number."
+OPERANDS_MUST_BE_NUMBERS = "Operands must be numbers."
+OPERANDS_MUST_BE_NUMBERS_OR_STRINGS = "Operands must be two numbers or two strings."
@@ -5,22 +5,31 @@ from tokens import Token
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor):
         pass
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "specialized")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        # Filled in by the interpreter on first execution: an (operation,
+        # operand type) pair, or False once the node is known to be generic.
+        self.specialized: Optional[tuple | bool] = None
 
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
@@ -29,6 +38,8 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: Any):
         self.value = value
 
@@ -37,6 +48,8 @@ class Literal(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
@@ -46,31 +59,42 @@ class Unary(Expr):
 
 
 class Variable(Expr):
-    name: Token = None
+    __slots__ = ("name", "depth", "slot")
+    name: Token
 
     def __init__(self, name: Token):
         self.name = name
+        # Filled in by the resolver; `depth = None` means a global, and
+        # `slot` is then its global slot.
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 
 
 class Assign(Expr):
-    name: Token = None
-    value: Expr = None
+    __slots__ = ("name", "value", "depth", "slot")
+    name: Token
+    value: Expr
 
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        # Filled in by the resolver; `depth = None` means a global, and
+        # `slot` is then its global slot.
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
 
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 
 
 class Logical(Expr):
-    left: Optional[Expr] = None
-    operator: Optional[Token] = None
-    right: Optional[Expr] = None
+    __slots__ = ("left", "operator", "right")
+    left: Optional[Expr]
+    operator: Optional[Token]
+    right: Optional[Expr]
 
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
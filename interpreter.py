@@ -1,30 +1,133 @@
 from __future__ import annotations
 
+import operator
 import typing
 import expr
 import stmt
 import tokens
-from environment import Environment
-from exceptions import LoxRuntimeError
+from environment import UNDEFINED, GlobalEnvironment, SlotEnvironment
+from exceptions import (
+    OPERAND_MUST_BE_A_NUMBER,
+    OPERANDS_MUST_BE_NUMBERS,
+    OPERANDS_MUST_BE_NUMBERS_OR_STRINGS,
+    LoxRuntimeError,
+)
 from visitor import Visitor
 from tokens import TokenType
 
 if typing.TYPE_CHECKING:
     import lox
 
+# Events `Interpreter.subscribe` accepts, with the arguments hooks receive:
+#   execute        (stmt)         before every statement
+#   block_enter    (stmt)         before a block's statements run
+#   block_exit     (stmt)         after they ran, even when one raised
+#   define         (name, value)  after `var` defined a variable
+#   assign         (name, value)  after an assignment
+#   runtime_error  (error)        when a `LoxRuntimeError` ends the program
+EVENTS = (
+    "execute",
+    "block_enter",
+    "block_exit",
+    "define",
+    "assign",
+    "runtime_error",
+)
+
+
+# What a `Binary` node can be specialized to: the operation for each
+# operator and the operand types it is valid for, when both operands have
+# that type. `==` and `!=` on two values of the same type agree with
+# `is_equal`.
+SPECIALIZATIONS = {
+    TokenType.PLUS: (operator.add, (float, str)),
+    TokenType.MINUS: (operator.sub, (float,)),
+    TokenType.STAR: (operator.mul, (float,)),
+    TokenType.SLASH: (operator.truediv, (float,)),
+    TokenType.GREATER: (operator.gt, (float,)),
+    TokenType.GREATER_EQUAL: (operator.ge, (float,)),
+    TokenType.LESS: (operator.lt, (float,)),
+    TokenType.LESS_EQUAL: (operator.le, (float,)),
+    TokenType.EQUAL_EQUAL: (operator.eq, (float, str, bool, type(None))),
+    TokenType.BANG_EQUAL: (operator.ne, (float, str, bool, type(None))),
+}
+
+
+def specialize(operator_type: TokenType, left, right) -> tuple | bool:
+    kind = left.__class__
+    if kind is right.__class__:
+        operation, kinds = SPECIALIZATIONS[operator_type]
+        if kind in kinds:
+            return operation, kind
+
+    return False
+
 
 # noinspection PyShadowingNames
 class Interpreter(Visitor):
     def __init__(self, interpreter: lox.Lox):
         self.interpreter = interpreter
-        self.environment = Environment()
+        self.globals = GlobalEnvironment()
+        self.environment = self.globals
+        self.hooks: dict[str, list] = {}
+        # One reusable scope per block that declares variables; see
+        # `visit_block_stmt`.
+        self.scopes: dict[stmt.Block, SlotEnvironment] = {}
+        # Binary nodes this run could not keep quickened; they are made
+        # quickenable again afterwards, so a shared program starts over on
+        # its next run instead of staying generic for good.
+        self.generic: list[expr.Binary] = []
+        # Called with every line `print` produces; embedders swap it out.
+        self.print = print
 
     def interpret(self, statements: list[stmt.Stmt]):
         try:
             for statement in statements:
                 self.execute(statement)
         except LoxRuntimeError as error:
+            for hook in self.hooks.get("runtime_error", ()):
+                hook(error)
             self.interpreter.runtime_error(error)
+        finally:
+            # Don't keep this program's blocks (and their values) alive.
+            self.scopes.clear()
+            self.reset_generic()
+
+    def reset_generic(self):
+        for node in self.generic:
+            node.specialized = None
+        self.generic.clear()
+
+    def reset_globals(self, names: dict[str, int]):
+        """Start over with no globals, laid out by the resolver table `names`.
+
+        Programs must be resolved against the table the globals use; a
+        caller running programs resolved elsewhere hands their table in.
+        """
+        self.globals = self.environment = GlobalEnvironment(names)
+
+    def subscribe(self, event: str, hook):
+        """Call `hook` on every `event`; see `EVENTS` for the arguments."""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown interpreter event '{event}'")
+
+        self.hooks.setdefault(event, []).append(hook)
+        self.install_hooks()
+
+    def unsubscribe(self, event: str, hook):
+        self.hooks[event].remove(hook)
+        if not self.hooks[event]:
+            del self.hooks[event]
+        self.install_hooks()
+
+    def install_hooks(self):
+        # While anything is subscribed the instance is switched to a subclass
+        # with hooked `execute`/`visit_*` methods; with no subscribers it is
+        # back to its plain class, so the hot path pays nothing. Swapping the
+        # class rather than shadowing methods on the instance keeps attribute
+        # lookups on the fast path.
+        plain = getattr(self, "unhooked", type(self))
+        self.__class__ = hooked_class(plain) if self.hooks else plain
 
     def visit_literal_expr(self, expr: expr.Literal):
         return expr.value
@@ -55,19 +158,31 @@ class Interpreter(Visitor):
                 return not self.is_truthy(right)
 
     def visit_variable_expr(self, expr: expr.Variable):
-        return self.environment.get(expr.name)
+        if expr.depth is None:
+            # `GlobalEnvironment.get_slot`, inlined: globals are read often.
+            try:
+                value = self.globals.slots[expr.slot]
+            except IndexError:
+                value = UNDEFINED
+            if value is UNDEFINED:
+                raise LoxRuntimeError(
+                    expr.name, f"Undefined variable '{expr.name.lexeme}'"
+                )
+            return value
+
+        return self.environment.get_at(expr.depth, expr.slot)
 
     def check_number_operand(self, operator: tokens.Token, operand):
         if isinstance(operand, float):
             return
 
-        raise LoxRuntimeError(operator, "Operands must be numbers.")
+        raise LoxRuntimeError(operator, OPERANDS_MUST_BE_NUMBERS)
 
     def check_number_operands(self, operator: tokens.Token, left, right):
         if isinstance(left, float) and isinstance(right, float):
             return
 
-        raise LoxRuntimeError(operator, "Operand must be a number.")
+        raise LoxRuntimeError(operator, OPERAND_MUST_BE_A_NUMBER)
 
     def is_truthy(self, object: object):
         if object is None:
@@ -109,7 +224,26 @@ class Interpreter(Visitor):
             self.environment = previous
 
     def visit_block_stmt(self, stmt: stmt.Block):
-        self.execute_block(stmt.statements, Environment(self.environment))
+        if not stmt.slot_count:
+            # The resolver gave it no scope: run it in the enclosing one.
+            for statement in stmt.statements:
+                self.execute(statement)
+            return
+
+        # Without functions nothing can hold on to a scope after its block
+        # has run, nor enter a block again while it runs, so each block
+        # reuses one scope, e.g. across loop iterations. Its slots need no
+        # clearing: the resolver only binds a name to a slot after its
+        # `var`, which assigns the slot first.
+        scope = self.scopes.get(stmt)
+        if scope is None:
+            scope = self.scopes[stmt] = SlotEnvironment(
+                self.environment, stmt.slot_count
+            )
+        else:
+            scope.enclosing = self.environment
+
+        self.execute_block(stmt.statements, scope)
 
     def visit_expression_stmt(self, stmt: stmt.Stmt):
         self.evaluate(stmt.expression)
@@ -122,14 +256,17 @@ class Interpreter(Visitor):
 
     def visit_print_stmt(self, stmt: stmt.Stmt):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.print(self.stringify(value))
 
     def visit_var_stmt(self, stmt: stmt.Var):
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
 
-        self.environment.define(stmt.name.lexeme, value)
+        if stmt.depth is None:
+            self.globals.define_slot(stmt.slot, stmt.name.lexeme, value)
+        else:
+            self.environment.slots[stmt.slot] = value
 
     def visit_while_stmt(self, stmt: stmt.While):
         while self.is_truthy(self.evaluate(stmt.condition)):
@@ -137,13 +274,44 @@ class Interpreter(Visitor):
 
     def visit_assign_expr(self, expr: expr.Assign):
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        if expr.depth is None:
+            # `GlobalEnvironment.assign_slot`, inlined like the read above.
+            slots = self.globals.slots
+            slot = expr.slot
+            if slot >= len(slots) or slots[slot] is UNDEFINED:
+                raise LoxRuntimeError(
+                    expr.name, f"Undefined variable '{expr.name.lexeme}'"
+                )
+            slots[slot] = value
+        else:
+            self.environment.assign_at(expr.depth, expr.slot, value)
+
         return value
 
     def visit_binary_expr(self, expr: expr.Binary):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
+        # Quickening: after its first execution a node checks the operand
+        # types it saw then and applies the operation directly.
+        specialized = expr.specialized
+        if specialized:
+            operation, kind = specialized
+            if left.__class__ is kind and right.__class__ is kind:
+                return operation(left, right)
+            # Other types turned up: stay generic for the rest of this run
+            # rather than flip-flop.
+            expr.specialized = False
+            self.generic.append(expr)
+        elif specialized is None:
+            specialized = expr.specialized = specialize(expr.operator.type, left, right)
+            if not specialized:
+                self.generic.append(expr)
+
+        return self.binary_operation(expr, left, right)
+
+    def binary_operation(self, expr: expr.Binary, left, right):
+        """The generic path, which also raises the type errors."""
         match expr.operator.type:
             case TokenType.GREATER:
                 self.check_number_operands(expr.operator, left, right)
@@ -163,7 +331,7 @@ class Interpreter(Visitor):
             case TokenType.BANG_EQUAL:
                 return not self.is_equal(left, right)
             case TokenType.EQUAL_EQUAL:
-                return not self.is_equal(left, right)
+                return self.is_equal(left, right)
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
                     return left + right
@@ -172,8 +340,7 @@ class Interpreter(Visitor):
                     return left + right
 
                 raise LoxRuntimeError(
-                    expr.operator,
-                    "Operands must be two numbers or two strings.",
+                    expr.operator, OPERANDS_MUST_BE_NUMBERS_OR_STRINGS
                 )
             case TokenType.SLASH:
                 self.check_number_operands(expr.operator, left, right)
@@ -181,3 +348,53 @@ class Interpreter(Visitor):
             case TokenType.STAR:
                 self.check_number_operands(expr.operator, left, right)
                 return left * right
+
+
+_hooked_classes: dict[type, type] = {}
+
+
+def hooked_class(cls: type) -> type:
+    """The subclass of `cls` an instance switches to while it has hooks."""
+    if cls in _hooked_classes:
+        return _hooked_classes[cls]
+
+    # noinspection PyShadowingNames
+    class Hooked(cls):
+        # No slots of its own, so instances can switch classes back and forth.
+        __slots__ = ()
+        unhooked = cls
+
+        def execute(self, stmt: stmt.Stmt):
+            for hook in self.hooks.get("execute", ()):
+                hook(stmt)
+            super().execute(stmt)
+
+        def visit_block_stmt(self, stmt: stmt.Block):
+            for hook in self.hooks.get("block_enter", ()):
+                hook(stmt)
+            try:
+                super().visit_block_stmt(stmt)
+            finally:
+                for hook in self.hooks.get("block_exit", ()):
+                    hook(stmt)
+
+        def visit_var_stmt(self, stmt: stmt.Var):
+            super().visit_var_stmt(stmt)
+            if stmt.depth is None:
+                value = self.globals.get_slot(stmt.slot, stmt.name)
+            else:
+                value = self.environment.slots[stmt.slot]
+
+            for hook in self.hooks.get("define", ()):
+                hook(stmt.name, value)
+
+        def visit_assign_expr(self, expr: expr.Assign):
+            value = super().visit_assign_expr(expr)
+            for hook in self.hooks.get("assign", ()):
+                hook(expr.name, value)
+
+            return value
+
+    Hooked.__name__ = Hooked.__qualname__ = f"Hooked{cls.__name__}"
+    _hooked_classes[cls] = Hooked
+    return Hooked
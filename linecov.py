@@ -0,0 +1,74 @@
+"""Line coverage of Lox scripts, written out in lcov's tracefile format."""
+
+from __future__ import annotations
+
+import os
+import typing
+from typing import TextIO
+
+import stmt
+from interpreter import Interpreter
+
+if typing.TYPE_CHECKING:
+    import lox
+
+
+class LineCoverage:
+    """Which lines of one script hold statements, and which of them ran.
+
+    Both are bytearrays indexed by line number, sized to the script before
+    it runs, so recording a hit is a single item assignment. Index 0 is
+    where statements without a line end up.
+    """
+
+    def __init__(self):
+        self.executable = bytearray()
+        self.executed = bytearray()
+
+    def allocate(self, lines: int):
+        # Grown in place: `CoveringInterpreter` holds on to `executed`.
+        self.executable.extend(bytes(lines + 2 - len(self.executable)))
+        self.executed.extend(bytes(lines + 2 - len(self.executed)))
+
+    def add_statements(self, statements: list[stmt.Stmt]):
+        for statement in statements:
+            self.add_statement(statement)
+
+    def add_statement(self, statement: stmt.Stmt):
+        match statement:
+            case stmt.Block():
+                # Braces are not worth reporting; the statements inside are.
+                self.add_statements(statement.statements)
+                return
+            case stmt.If():
+                self.add_statement(statement.then_branch)
+                if statement.else_branch is not None:
+                    self.add_statement(statement.else_branch)
+            case stmt.While():
+                self.add_statement(statement.body)
+
+        self.executable[statement.line or 0] = 1
+
+    def write_lcov(self, file: TextIO, script: str):
+        lines = [line for line, flag in enumerate(self.executable) if flag and line]
+        hit = sum(self.executed[line] for line in lines)
+
+        print("TN:", file=file)
+        print(f"SF:{os.path.abspath(script)}", file=file)
+        for line in lines:
+            print(f"DA:{line},{self.executed[line]}", file=file)
+        print(f"LF:{len(lines)}", file=file)
+        print(f"LH:{hit}", file=file)
+        print("end_of_record", file=file)
+
+
+class CoveringInterpreter(Interpreter):
+    """`Interpreter` that marks the line of every statement it executes."""
+
+    def __init__(self, interpreter: lox.Lox, coverage: LineCoverage):
+        super().__init__(interpreter)
+        self.executed = coverage.executed
+
+    def execute(self, stmt: stmt.Stmt):
+        self.executed[stmt.line or 0] = 1
+        stmt.accept(self)
@@ -1,53 +1,235 @@
 from __future__ import annotations
 from typing import Optional
+import contextlib
+import json
 import sys
+import time
 
 import click
 
+import batch
+import bench
+import cache
 from ast_printer import AstPrinter
+from budget import BudgetedInterpreter
+from closures import ClosureInterpreter
 from interpreter import Interpreter
+from linecov import CoveringInterpreter, LineCoverage
+from optimizer import Optimizer
+from output import BUFFER_SIZE, FLUSH_INTERVAL, BufferedSink, MemorySink
 
 # noinspection PyCompatibility
 from parser import Parser
-from scanner import Scanner
+from profiler import Profile, ProfilingInterpreter
+from resolver import Resolver
+from scanner import ArrayScanner, FastScanner, Scanner, StreamScanner
 from tokens import Token, TokenType
+from transpiler import TranspilingInterpreter
+from vm import VM
+
+# Every engine is built as `Engine(interpreter=reporter)` and offers:
+#   interpret(statements)  run resolved statements, reporting runtime errors
+#   print                  called with every line `print` produces
+#   globals                root environment; `globals.values` is a dict view
+#   reset_globals(names)   start over with no globals, laid out by the
+#                          resolver's name -> slot table `names`; engines
+#                          that look globals up by name ignore `names`
+ENGINES = {
+    "tree": Interpreter,
+    "vm": VM,
+    "closure": ClosureInterpreter,
+    "python": TranspilingInterpreter,
+}
+
+SCANNERS = {
+    "classic": Scanner,
+    "fast": FastScanner,
+    "array": ArrayScanner,
+}
 
 
 class Lox:
     had_error = False
     had_runtime_error = False
 
-    def __init__(self):
-        self.interpreter = Interpreter(interpreter=self)
+    def __init__(
+        self,
+        engine: str = "tree",
+        use_cache: bool = True,
+        optimize: bool = False,
+        scanner: str = "classic",
+        stream: bool = False,
+        pipeline: bool = False,
+        profile: bool = False,
+        flamegraph: Optional[str] = None,
+        coverage: Optional[str] = None,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = None,
+        output: Optional[BufferedSink | MemorySink] = None,
+    ):
+        self.scanner = SCANNERS[scanner]
+        self.stream = stream
+        self.pipeline = pipeline
+        self.use_cache = use_cache
+        self.optimize = optimize
+        self.eliminated_nodes = 0
+        self.profile = Profile() if profile or flamegraph else None
+        self.flamegraph = flamegraph
+        self.coverage = LineCoverage() if coverage else None
+        self.coverage_file = coverage
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.output = BufferedSink() if output is None else output
+        # Global name -> slot, shared by every program this `Lox` resolves,
+        # so globals survive between `run` calls.
+        self.global_slots: dict[str, int] = {}
+        self.engines = {}
+        self.interpreter = self.get_engine(engine)
+
+    def get_engine(self, engine: str):
+        # Engines are created lazily and kept, so each one's globals survive
+        # between `run` calls just like the default interpreter's.
+        if engine not in self.engines:
+            if self.profile is not None and engine == "tree":
+                self.engines[engine] = ProfilingInterpreter(self, self.profile)
+            elif self.coverage is not None and engine == "tree":
+                self.engines[engine] = CoveringInterpreter(self, self.coverage)
+            elif self.has_budget() and engine == "tree":
+                self.engines[engine] = BudgetedInterpreter(
+                    self, self.max_steps, self.timeout
+                )
+            else:
+                self.engines[engine] = ENGINES[engine](interpreter=self)
+            self.engines[engine].reset_globals(self.global_slots)
+            self.engines[engine].print = self.output.write
+
+        return self.engines[engine]
+
+    def has_budget(self):
+        return self.max_steps is not None or self.timeout is not None
 
     def run_file(self, script):
-        with open(script) as f:
-            source = f.read()
+        if self.coverage is not None:
+            with open(script) as f:
+                self.coverage.allocate(sum(1 for _ in f))
+
+        try:
+            if self.pipeline:
+                self.run_pipelined(script)
+            else:
+                statements = self.load(script)
+                if not self.had_error:
+                    self.execute(statements)
+        finally:
+            self.output.flush()
+
+        if self.optimize:
+            print(
+                f"Optimizer eliminated {self.eliminated_nodes} nodes.",
+                file=sys.stderr,
+            )
+
+        if self.profile is not None:
+            self.profile.report(sys.stderr)
+            if self.flamegraph:
+                with open(self.flamegraph, "w") as f:
+                    self.profile.write_collapsed(f)
+
+        if self.coverage is not None:
+            with open(self.coverage_file, "w") as f:
+                self.coverage.write_lcov(f, script)
 
-        self.run(source)
         if self.had_error:
             exit(65)
         if self.had_runtime_error:
             exit(70)
 
+    def run_pipelined(self, script):
+        with open(script) as f:
+            if self.stream:
+                tokens = StreamScanner(f, interpreter=self)
+            else:
+                with self.phase("scan"):
+                    tokens = self.scanner(f.read(), interpreter=self).scan_tokens()
+
+            for statement in Parser(tokens, interpreter=self).declarations():
+                # After the first syntax or runtime error nothing else runs,
+                # but parsing continues so every syntax error is reported.
+                if not (self.had_error or self.had_runtime_error):
+                    self.execute([statement])
+
+    def load(self, script):
+        if self.stream:
+            # Tokens are produced lazily while the parser consumes them, so
+            # the source is never held in memory as a whole (nor cached).
+            with open(script) as f, self.phase("scan+parse"):
+                return Parser(StreamScanner(f, interpreter=self), self).parse()
+
+        with open(script) as f:
+            source = f.read()
+
+        statements = None
+        if self.use_cache:
+            with self.phase("cache"):
+                statements = cache.load(script, source)
+
+        if statements is None:
+            statements = self.parse(source)
+            if self.use_cache and not self.had_error:
+                with self.phase("cache"):
+                    cache.store(script, source, statements)
+
+        return statements
+
     def run_prompt(self):
         while True:
             line = input("> ")
             self.run(line)
             self.had_error = False
 
-    def run(self, source: str):
-        scanner = Scanner(source, interpreter=self)
-        tokens: list[Token] = scanner.scan_tokens()
-        parser = Parser(tokens, interpreter=self)
-        # expression = parser.parse()
-        statements = parser.parse()
+    def run(self, source: str, engine: Optional[str] = None):
+        statements = self.parse(source)
 
         if self.had_error:
             return
 
+        try:
+            self.execute(statements, engine)
+        finally:
+            self.output.flush()
+
+    def parse(self, source: str):
+        scanner = self.scanner(source, interpreter=self)
+        with self.phase("scan"):
+            tokens = scanner.scan_tokens()
+        with self.phase("parse"):
+            parser = Parser(tokens, interpreter=self)
+            # expression = parser.parse()
+            return parser.parse()
+
+    def phase(self, name: str):
+        # Timing is only wired in when profiling; otherwise this is a no-op.
+        if self.profile is None:
+            return contextlib.nullcontext()
+
+        return self.profile.phase(name)
+
+    def execute(self, statements, engine: Optional[str] = None):
         # print(AstPrinter().print(expression))
-        self.interpreter.interpret(statements)
+        if self.optimize:
+            with self.phase("optimize"):
+                optimizer = Optimizer()
+                statements = optimizer.optimize(statements)
+                self.eliminated_nodes += optimizer.eliminated
+
+        if self.coverage is not None:
+            self.coverage.add_statements(statements)
+
+        with self.phase("resolve"):
+            Resolver(self.global_slots).resolve(statements)
+        interpreter = self.interpreter if engine is None else self.get_engine(engine)
+        with self.phase("interpret"):
+            interpreter.interpret(statements)
 
     def error(
         self, line: Optional[int] = None, token: Optional[Token] = None, message=""
@@ -61,17 +243,159 @@ class Lox:
             self.report(token.line, f" at '{token.lexeme}'", message)
 
     def runtime_error(self, error):
+        self.output.flush()
         print(f"{error.message}\n[line {error.token.line}]", file=sys.stderr)
         self.had_runtime_error = True
 
     def report(self, line, where, message):
+        # Syntax errors go to stdout too; keep them after earlier output.
+        self.output.flush()
         print(f"[line {line}] Error {where}: {message}")
 
 
-@click.command()
+class LoxCommands(click.Group):
+    """Command group that falls back to `run` when no command is named.
+
+    Keeps `lox.py script.lox` and `lox.py --engine vm` working next to
+    `lox.py bench`.
+    """
+
+    def parse_args(self, ctx, args):
+        if not args or (args[0] not in self.commands and args[0] != "--help"):
+            args = ["run", *args]
+
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=LoxCommands)
+def main():
+    pass
+
+
+@main.command("run")
 @click.argument("script", required=False)
-def main(script):
-    lox = Lox()
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="tree",
+    show_default=True,
+    help="Execution engine: tree walker, bytecode VM, closures or Python code.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Reuse parsed programs from the __loxcache__ directory.",
+)
+@click.option(
+    "-O",
+    "--optimize",
+    is_flag=True,
+    help="Fold constants and drop dead branches; reports eliminated nodes.",
+)
+@click.option(
+    "--scanner",
+    type=click.Choice(list(SCANNERS)),
+    default="classic",
+    show_default=True,
+    help="Scanner implementation: character by character, regex based, or "
+    "regex based into a compact token array.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Read and tokenize the script incrementally instead of all at once.",
+)
+@click.option(
+    "--pipeline",
+    is_flag=True,
+    help="Execute each top-level declaration as soon as it is parsed.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report time per phase and, with the tree engine, the hottest lines.",
+)
+@click.option(
+    "--flamegraph",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write collapsed stacks for flamegraph.pl to this file; implies " "--profile.",
+)
+@click.option(
+    "--coverage",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the lines that ran, in lcov format, to this file.",
+)
+@click.option(
+    "--max-steps",
+    type=click.IntRange(min=0),
+    help="Stop the script with a runtime error after this many statements.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    help="Stop the script with a runtime error after this many seconds.",
+)
+@click.option(
+    "--output-buffer",
+    type=click.IntRange(min=0),
+    default=BUFFER_SIZE,
+    show_default=True,
+    help="Characters of output to collect before writing them; 0 writes "
+    "every line as it is printed.",
+)
+@click.option(
+    "--flush-interval",
+    type=click.FloatRange(min=0),
+    default=FLUSH_INTERVAL,
+    show_default=True,
+    help="Also write collected output at most this many seconds after it "
+    "was printed.",
+)
+def run_command(
+    script,
+    engine,
+    cache,
+    optimize,
+    scanner,
+    stream,
+    pipeline,
+    profile,
+    flamegraph,
+    coverage,
+    max_steps,
+    timeout,
+    output_buffer,
+    flush_interval,
+):
+    """Run SCRIPT, or start a prompt when no script is given."""
+    if coverage and (engine != "tree" or not script):
+        raise click.UsageError("--coverage needs a script and --engine tree.")
+    if coverage and (profile or flamegraph):
+        raise click.UsageError("--coverage cannot be combined with profiling.")
+    if max_steps is not None or timeout is not None:
+        if engine != "tree":
+            raise click.UsageError("--max-steps and --timeout need --engine tree.")
+        if coverage or profile or flamegraph:
+            raise click.UsageError(
+                "--max-steps and --timeout cannot be combined with profiling "
+                "or coverage."
+            )
+
+    lox = Lox(
+        engine=engine,
+        use_cache=cache,
+        optimize=optimize,
+        scanner=scanner,
+        stream=stream,
+        pipeline=pipeline,
+        profile=profile,
+        flamegraph=flamegraph,
+        coverage=coverage,
+        max_steps=max_steps,
+        timeout=timeout,
+        output=BufferedSink(size=output_buffer, interval=flush_interval),
+    )
 
     if script:
         lox.run_file(script)
@@ -79,5 +403,208 @@ def main(script):
         lox.run_prompt()
 
 
+@main.command("bench")
+@click.option(
+    "--workload",
+    "workloads",
+    type=click.Choice(list(bench.WORKLOADS)),
+    multiple=True,
+    help="Workload to run; repeat the option for several. Defaults to all.",
+)
+@click.option("--repeat", default=5, show_default=True, help="Runs per workload.")
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="tree",
+    show_default=True,
+)
+@click.option(
+    "--scanner",
+    type=click.Choice(list(SCANNERS)),
+    default="classic",
+    show_default=True,
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    help="Write the results as JSON to this file ('-' for stdout).",
+)
+@click.option(
+    "--baseline",
+    type=click.File("r"),
+    help="JSON results of an earlier run to compare against.",
+)
+@click.option(
+    "--threshold",
+    default=0.1,
+    show_default=True,
+    help="Slowdown of a median timing reported as a regression (0.1 = 10%).",
+)
+def bench_command(workloads, repeat, engine, scanner, output, baseline, threshold):
+    """Time scanning, parsing and interpretation of the benchmark workloads.
+
+    Exits with status 1 when compared with --baseline and any phase got
+    slower than the threshold allows.
+    """
+    results = bench.run(
+        workloads or bench.WORKLOADS,
+        lambda: Lox(engine=engine, use_cache=False, scanner=scanner),
+        repeat,
+        {"engine": engine, "scanner": scanner},
+    )
+
+    # With --output - the JSON owns stdout, so the table goes to stderr.
+    # click opens '-' as a wrapper named "<stdout>", not as sys.stdout.
+    to_stderr = output is not None and output.name == "<stdout>"
+    for name, phases in results["results"].items():
+        timings = "  ".join(
+            f"{phase} {phases[phase]['median'] * 1000:9.2f} ms"
+            for phase in bench.PHASES
+        )
+        click.echo(f"{name:<14} {timings}", err=to_stderr)
+
+    if output is not None:
+        json.dump(results, output, indent=2)
+        output.write("\n")
+
+    if baseline is None:
+        return
+
+    regressions = 0
+    for name, phase, before, after, ratio, regressed in bench.compare(
+        results, json.load(baseline), threshold
+    ):
+        regressions += regressed
+        click.echo(
+            f"{name:<14} {phase:<9} {before * 1000:9.2f} ms -> "
+            f"{after * 1000:9.2f} ms  {ratio:5.2f}x"
+            + ("  REGRESSION" if regressed else ""),
+            err=to_stderr,
+        )
+
+    if regressions:
+        sys.exit(1)
+
+
+@main.command("batch")
+@click.argument("scripts", nargs=-1, required=True)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=batch.default_jobs(),
+    show_default="number of CPUs",
+    help="Worker processes.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="tree",
+    show_default=True,
+)
+@click.option(
+    "--scanner",
+    type=click.Choice(list(SCANNERS)),
+    default="classic",
+    show_default=True,
+)
+@click.option("--cache/--no-cache", default=True, show_default=True)
+@click.option(
+    "--show-output",
+    is_flag=True,
+    help="Print each script's captured stdout and stderr after its result.",
+)
+def batch_command(scripts, jobs, engine, scanner, cache, show_output):
+    """Run many SCRIPTS (paths or glob patterns) in parallel.
+
+    Prints the exit status of every script as `lox.py run` would report it
+    (65 for syntax errors, 70 for runtime errors) and a summary, and exits
+    with status 1 if any script failed.
+    """
+    scripts = batch.expand(scripts)
+    options = {"engine": engine, "scanner": scanner, "use_cache": cache}
+    statuses = {}
+    start = time.perf_counter()
+
+    for result in batch.run_batch(scripts, jobs, Lox, options):
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+        click.echo(
+            f"{result.status:>3} {result.elapsed * 1000:9.1f} ms  {result.script}"
+        )
+        if show_output:
+            click.echo(result.stdout, nl=False)
+            click.echo(result.stderr, nl=False, err=True)
+
+    elapsed = time.perf_counter() - start
+    counts = ", ".join(
+        f"{count} exited {status}" for status, count in sorted(statuses.items())
+    )
+    click.echo(
+        f"{len(scripts)} scripts in {elapsed:.2f}s with {jobs} workers: {counts}"
+    )
+
+    if set(statuses) - {0}:
+        sys.exit(1)
+
+
+@main.command("serve")
+@click.option(
+    "--socket",
+    "path",
+    default="/tmp/lox.sock",
+    show_default=True,
+    help="Unix domain socket to listen on.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Warm interpreters, and so scripts that can run at once.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(list(ENGINES)),
+    default="tree",
+    show_default=True,
+)
+@click.option(
+    "--scanner",
+    type=click.Choice(list(SCANNERS)),
+    default="fast",
+    show_default=True,
+)
+@click.option(
+    "--max-steps",
+    type=click.IntRange(min=0),
+    help="Statements each request may execute; needs --engine tree.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    help="Seconds each request may run; needs --engine tree.",
+)
+@click.option("--quiet", is_flag=True, help="Do not log every request.")
+def serve_command(path, workers, engine, scanner, max_steps, timeout, quiet):
+    """Run scripts sent over a Unix socket by `client.py` or any other client.
+
+    The protocol is described in server.py.
+    """
+    # Imported here: the server builds on embed.py, which imports this module.
+    import embed
+    import server
+
+    try:
+        compiler = embed.Engine(engine, scanner, max_steps=max_steps, timeout=timeout)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+
+    click.echo(f"Listening on {path}", err=True)
+    try:
+        server.serve(path, compiler, workers, log=not quiet)
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import expr
+import stmt
+from exceptions import LoxRuntimeError
+from expr import Literal
+from interpreter import Interpreter
+from tokens import TokenType
+from visitor import Visitor
+
+
+def count_nodes(node) -> int:
+    """Number of expression and statement nodes in the tree under `node`."""
+    match node:
+        case None:
+            return 0
+        case expr.Binary() | expr.Logical():
+            return 1 + count_nodes(node.left) + count_nodes(node.right)
+        case expr.Grouping():
+            return 1 + count_nodes(node.expression)
+        case expr.Unary():
+            return 1 + count_nodes(node.right)
+        case expr.Assign():
+            return 1 + count_nodes(node.value)
+        case expr.Literal() | expr.Variable():
+            return 1
+        case stmt.Expression() | stmt.Print():
+            return 1 + count_nodes(node.expression)
+        case stmt.Var():
+            return 1 + count_nodes(node.initializer)
+        case stmt.Block():
+            return 1 + sum(count_nodes(statement) for statement in node.statements)
+        case stmt.If():
+            return (
+                1
+                + count_nodes(node.condition)
+                + count_nodes(node.then_branch)
+                + count_nodes(node.else_branch)
+            )
+        case stmt.While():
+            return 1 + count_nodes(node.condition) + count_nodes(node.body)
+
+    raise ValueError(f"Unknown node {type(node).__name__}")
+
+
+# noinspection PyShadowingNames
+class Optimizer(Visitor):
+    """Constant folding and dead-branch elimination over the parsed AST.
+
+    Constant `Binary`, `Unary` and `Logical` subtrees are evaluated once with
+    a scratch `Interpreter`, so folding follows exactly the runtime semantics.
+    Anything that would raise (`-"str"`, `1 / 0`) is left in place to fail at
+    its original line when it actually runs. Every `visit_*` returns the
+    replacement node, or None for a statement that can be dropped.
+    """
+
+    def __init__(self):
+        self.evaluator = Interpreter(interpreter=None)
+        self.eliminated = 0
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        before = sum(count_nodes(statement) for statement in statements)
+        statements = self.optimize_statements(statements)
+        self.eliminated += before - sum(
+            count_nodes(statement) for statement in statements
+        )
+        return statements
+
+    def optimize_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        optimized = (statement.accept(self) for statement in statements)
+        return [statement for statement in optimized if statement is not None]
+
+    def optimize_branch(self, branch: Optional[stmt.Stmt]) -> stmt.Stmt:
+        # Branches and loop bodies must stay statements, so a dropped one is
+        # replaced by an empty block.
+        optimized = branch.accept(self)
+        return stmt.Block([], branch.line) if optimized is None else optimized
+
+    def fold(self, expr: expr.Expr) -> expr.Expr:
+        try:
+            return Literal(self.evaluator.evaluate(expr))
+        except (LoxRuntimeError, ArithmeticError):
+            return expr
+
+    def is_truthy(self, value) -> bool:
+        return self.evaluator.is_truthy(value)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        stmt.statements = self.optimize_statements(stmt.statements)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        stmt.condition = stmt.condition.accept(self)
+
+        if isinstance(stmt.condition, Literal):
+            if self.is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.optimize_branch(stmt.else_branch)
+
+        return stmt
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+
+        return stmt
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        stmt.condition = stmt.condition.accept(self)
+
+        if isinstance(stmt.condition, Literal) and not self.is_truthy(
+            stmt.condition.value
+        ):
+            return None
+
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        return expr
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        return expr
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        # Grouping only matters to the parser; the tree already encodes it.
+        return expr.expression.accept(self)
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        expr.right = expr.right.accept(self)
+
+        if isinstance(expr.right, Literal):
+            return self.fold(expr)
+
+        return expr
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self.fold(expr)
+
+        return expr
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+
+        if not isinstance(expr.left, Literal):
+            return expr
+
+        # `or` keeps a truthy left operand and `and` a falsy one; otherwise
+        # the result is whatever the right operand evaluates to.
+        if self.is_truthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+            return expr.left
+
+        return expr.right
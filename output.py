@@ -0,0 +1,85 @@
+"""Where the output of Lox `print` statements goes.
+
+Every engine calls its `print` attribute with each line; `Lox` points it at
+the `write` method of one of these sinks.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Optional, TextIO
+
+# Flush once this many characters are waiting.
+BUFFER_SIZE = 64 * 1024
+# Longest a printed line waits before it is written, in seconds.
+FLUSH_INTERVAL = 0.1
+
+
+class BufferedSink:
+    """Collects lines and writes them to `file` in large chunks.
+
+    Output is written once `size` characters are waiting, `interval` seconds
+    after the first line of a chunk was printed (on a timer thread, so a
+    line printed before a long computation still shows up), and on `flush`,
+    which `Lox` calls at exit, before reporting errors and after every REPL
+    line. A `size` of 0 writes every line as it comes. `file` defaults to
+    whatever `sys.stdout` is when the output is written.
+    """
+
+    def __init__(
+        self,
+        file: Optional[TextIO] = None,
+        size: int = BUFFER_SIZE,
+        interval: Optional[float] = FLUSH_INTERVAL,
+    ):
+        self.file = file
+        self.size = size
+        self.interval = interval
+        self.lines: list[str] = []
+        self.pending = 0
+        self.timer: Optional[threading.Timer] = None
+        # The timer thread flushes while the interpreter may be writing.
+        self.lock = threading.Lock()
+
+    def write(self, line: str):
+        with self.lock:
+            self.lines.append(line)
+            self.pending += len(line) + 1
+            if self.pending >= self.size:
+                self.write_out()
+            elif self.timer is None and self.interval is not None:
+                self.timer = threading.Timer(self.interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.write_out()
+
+    def write_out(self):
+        # Callers hold `lock`.
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.lines:
+            file = self.file or sys.stdout
+            self.lines.append("")
+            file.write("\n".join(self.lines))
+            file.flush()
+            self.lines = []
+            self.pending = 0
+
+
+class MemorySink:
+    """Keeps every line in `lines`, for embedding and tests."""
+
+    def __init__(self, lines: Optional[list[str]] = None):
+        self.lines = [] if lines is None else lines
+        self.write = self.lines.append
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> str:
+        return "".join(f"{line}\n" for line in self.lines)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import typing
+from typing import Iterable, Optional
 
 import stmt
-from tokens import Token, TokenType
+from tokens import TOKEN_TYPES, Token, TokenArray, TokenType
 from expr import Binary, Unary, Literal, Grouping, Variable, Assign, Logical
 
 if typing.TYPE_CHECKING:
@@ -15,27 +16,83 @@ class ParseException(Exception):
         interpreter.error(token=token, message=message)
 
 
-class Parser:
-    current = 0
+class TokenCursor:
+    """One token of lookahead over any iterable of tokens.
+
+    Only the current and the previous token are kept, so `tokens` may be a
+    lazy stream.
+    """
+
+    def __init__(self, tokens: Iterable[Token]):
+        self.tokens = iter(tokens)
+        self.current: Token = next(self.tokens)
+        self.last: Optional[Token] = None
+        self.type = self.current.type
+
+    def advance(self):
+        self.last = self.current
+        self.current = next(self.tokens)
+        self.type = self.current.type
+
+    def peek(self) -> Token:
+        return self.current
+
+    def previous(self) -> Optional[Token]:
+        return self.last
+
+    def line(self) -> int:
+        return self.current.line
 
-    def __init__(self, tokens: list[Token], interpreter: lox.Lox):
+
+class TokenArrayCursor:
+    """Walks a `TokenArray` by index, building `Token`s only when asked."""
+
+    def __init__(self, tokens: TokenArray):
         self.tokens = tokens
+        self.types = tokens.types
+        self.position = 0
+        self.type = TOKEN_TYPES[self.types[0]]
+
+    def advance(self):
+        self.position += 1
+        self.type = TOKEN_TYPES[self.types[self.position]]
+
+    def peek(self) -> Token:
+        return self.tokens[self.position]
+
+    def previous(self) -> Optional[Token]:
+        return self.tokens[self.position - 1] if self.position else None
+
+    def line(self) -> int:
+        return self.tokens.lines[self.position]
+
+
+class Parser:
+    def __init__(self, tokens: Iterable[Token], interpreter: lox.Lox):
+        # The grammar looks at token types far more often than at the tokens
+        # themselves, so the cursor keeps the current type at hand.
+        if isinstance(tokens, TokenArray):
+            self.tokens = TokenArrayCursor(tokens)
+        else:
+            self.tokens = TokenCursor(tokens)
         self.interpreter = interpreter
 
     def parse(self):
-        statements = []
-        while not self.is_at_end():
-            statements.append(self.declaration())
+        return list(self.declarations())
 
-        return statements
+    def declarations(self):
+        """Yield top-level declarations one at a time as they are parsed."""
+        while not self.is_at_end():
+            yield self.declaration()
 
     def expression(self):
         return self.assignment()
 
     def declaration(self):
+        line = self.tokens.line()
         try:
             if self.match(TokenType.VAR):
-                return self.var_declaration()
+                return self.var_declaration(line)
 
             return self.statement()
         except ParseException as e:
@@ -43,32 +100,36 @@ class Parser:
             return
 
     def statement(self):
+        # Every statement records the line of its first token.
+        line = self.tokens.line()
+
         if self.match(TokenType.FOR):
-            return self.for_statement()
+            return self.for_statement(line)
 
         if self.match(TokenType.IF):
-            return self.if_statement()
+            return self.if_statement(line)
 
         if self.match(TokenType.PRINT):
-            return self.print_statement()
+            return self.print_statement(line)
 
         if self.match(TokenType.WHILE):
-            return self.while_statement()
+            return self.while_statement(line)
 
         if self.match(TokenType.LEFT_BRACE):
-            return stmt.Block(self.block())
+            return stmt.Block(self.block(), line)
 
-        return self.expression_statement()
+        return self.expression_statement(line)
 
-    def for_statement(self):
+    def for_statement(self, line: int):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
+        initializer_line = self.tokens.line()
         if self.match(TokenType.SEMICOLON):
             initializer = None
         elif self.match(TokenType.VAR):
-            initializer = self.var_declaration()
+            initializer = self.var_declaration(initializer_line)
         else:
-            initializer = self.expression_statement()
+            initializer = self.expression_statement(initializer_line)
 
         condition = None
         if not self.check(TokenType.SEMICOLON):
@@ -84,18 +145,18 @@ class Parser:
         body = self.statement()
 
         if increment is not None:
-            body = stmt.Block([body, stmt.Expression(increment)])
+            body = stmt.Block([body, stmt.Expression(increment, line)], line)
 
         if condition is None:
             condition = Literal(True)
-        body = stmt.While(condition, body)
+        body = stmt.While(condition, body, line)
 
         if initializer is not None:
-            body = stmt.Block([body, stmt.Expression(increment)])
+            body = stmt.Block([initializer, body], line)
 
         return body
 
-    def if_statement(self):
+    def if_statement(self, line: int):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
@@ -105,35 +166,36 @@ class Parser:
         if self.match(TokenType.ELSE):
             else_branch = self.statement()
 
-        return stmt.If(condition, then_branch, else_branch)
+        return stmt.If(condition, then_branch, else_branch, line)
 
-    def print_statement(self):
+    def print_statement(self, line: int):
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
-        return stmt.Print(value)
+        return stmt.Print(value, line)
 
-    def var_declaration(self):
-        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+    def var_declaration(self, line: int):
+        self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+        name = self.previous()
         initializer = None
 
         if self.match(TokenType.EQUAL):
             initializer = self.expression()
 
         self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
-        return stmt.Var(name, initializer)
+        return stmt.Var(name, initializer, line)
 
-    def while_statement(self):
+    def while_statement(self, line: int):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
         body = self.statement()
 
-        return stmt.While(condition, body)
+        return stmt.While(condition, body, line)
 
-    def expression_statement(self):
+    def expression_statement(self, line: int):
         expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
-        return stmt.Expression(expr)
+        return stmt.Expression(expr, line)
 
     def block(self):
         statements = []
@@ -255,37 +317,39 @@ class Parser:
     def match(self, *types: TokenType) -> bool:
         for _type in types:
             if self.check(_type):
-                self.advance()
+                self.tokens.advance()
                 return True
 
         return False
 
     def consume(self, token_type, message):
+        # Unlike `advance`, the consumed token is not returned: most of them
+        # are punctuation nobody looks at, so `previous()` is asked for the
+        # few that matter.
         if self.check(token_type):
-            return self.advance()
+            self.tokens.advance()
+            return
 
         raise ParseException(self.peek(), message, self.interpreter)
 
     def check(self, token_type: TokenType):
-        if self.is_at_end():
-            return False
-
-        return self.peek().type == token_type
+        current = self.tokens.type
+        return current == token_type and current != TokenType.EOF
 
     def advance(self) -> Token:
         if not self.is_at_end():
-            self.current += 1
+            self.tokens.advance()
 
         return self.previous()
 
     def is_at_end(self):
-        return self.peek().type == TokenType.EOF
+        return self.tokens.type == TokenType.EOF
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.tokens.peek()
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.tokens.previous()
 
     def synchronize(self):
         self.advance()
@@ -0,0 +1,148 @@
+"""Phase timings and a per-node profile of the tree-walking interpreter."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+import typing
+from collections import defaultdict
+from typing import Optional, TextIO
+
+import expr
+import stmt
+from interpreter import Interpreter
+
+if typing.TYPE_CHECKING:
+    import lox
+
+
+class Profile:
+    """Everything recorded during one profiled run.
+
+    `phases` maps a pipeline phase to its accumulated wall time. Node
+    statistics are keyed by (line, node kind): `counts` and `totals` hold
+    executions and inclusive time, `own` the time spent in the node itself
+    minus its children, and `stacks` that same exclusive time per chain of
+    enclosing nodes, which is what collapsed-stack flamegraphs are made of.
+    All times are in seconds.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = defaultdict(float)
+        self.counts: dict[tuple[int, str], int] = defaultdict(int)
+        self.totals: dict[tuple[int, str], float] = defaultdict(float)
+        self.own: dict[tuple[int, str], float] = defaultdict(float)
+        self.stacks: dict[str, float] = defaultdict(float)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def report(self, file: TextIO, limit: int = 20):
+        print(f"{'phase':<12}{'ms':>10}", file=file)
+        for name, elapsed in self.phases.items():
+            print(f"{name:<12}{elapsed * 1000:10.2f}", file=file)
+        print(f"{'total':<12}{sum(self.phases.values()) * 1000:10.2f}", file=file)
+
+        if not self.counts:
+            return
+
+        print(
+            f"\n{'count':>10}{'total ms':>12}{'self ms':>12}{'line':>7}  node",
+            file=file,
+        )
+        hottest = sorted(self.own, key=self.own.__getitem__, reverse=True)
+        for key in hottest[:limit]:
+            line, kind = key
+            print(
+                f"{self.counts[key]:>10}{self.totals[key] * 1000:12.2f}"
+                f"{self.own[key] * 1000:12.2f}{line or '?':>7}  {kind}",
+                file=file,
+            )
+
+    def write_collapsed(self, file: TextIO):
+        """Write one `frame;frame;frame microseconds` line per stack."""
+        for path, elapsed in self.stacks.items():
+            print(f"{path} {round(elapsed * 1_000_000)}", file=file)
+
+
+def node_line(node) -> Optional[int]:
+    match node:
+        case stmt.Stmt():
+            return node.line
+        case expr.Binary() | expr.Logical() | expr.Unary():
+            return node.operator.line
+        case expr.Variable() | expr.Assign():
+            return node.name.line
+
+    # Literals and groupings carry no token of their own.
+    return None
+
+
+class ProfilingInterpreter(Interpreter):
+    """`Interpreter` that times every statement and expression it runs.
+
+    Only used when profiling, so the plain `Interpreter` pays nothing for it.
+    Nodes without a line of their own are attributed to their parent's.
+    """
+
+    def __init__(self, interpreter: lox.Lox, profile: Profile):
+        super().__init__(interpreter)
+        self.profile = profile
+        self.labels: dict[object, tuple[tuple[int, str], str]] = {}
+        # One entry per node being run: its key, its stack path and the time
+        # spent so far in its children.
+        self.frames: list[list] = []
+        # How many nodes with each key are running; inclusive time is only
+        # added by the outermost one so nested nodes on one line (a `for`
+        # loop's blocks) are not counted twice.
+        self.active: dict[tuple[int, str], int] = defaultdict(int)
+
+    def execute(self, stmt: stmt.Stmt):
+        self.run_node(stmt, super().execute)
+
+    def evaluate(self, expr: expr.Expr):
+        return self.run_node(expr, super().evaluate)
+
+    def label(self, node) -> tuple[tuple[int, str], str]:
+        # A node always sits under the same parents, so its key and stack
+        # path are worked out once. Keying by the node itself keeps it alive,
+        # so no other node can inherit its entry.
+        label = self.labels.get(node)
+        if label is None:
+            parent = self.frames[-1] if self.frames else None
+            line = node_line(node)
+            if line is None and parent is not None:
+                line = parent[0][0]
+            key = (line, type(node).__name__)
+            frame = f"{key[1]}:{line or '?'}"
+            path = f"{parent[1]};{frame}" if parent is not None else frame
+            label = self.labels[node] = (key, path)
+
+        return label
+
+    def run_node(self, node, run):
+        key, path = self.label(node)
+        frame = [key, path, 0.0]
+        self.frames.append(frame)
+        self.active[key] += 1
+        start = time.perf_counter()
+        try:
+            return run(node)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.frames.pop()
+            if self.frames:
+                self.frames[-1][2] += elapsed
+
+            profile = self.profile
+            profile.counts[key] += 1
+            self.active[key] -= 1
+            if not self.active[key]:
+                profile.totals[key] += elapsed
+            profile.own[key] += elapsed - frame[2]
+            profile.stacks[path] += elapsed - frame[2]
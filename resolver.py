@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import expr
+import stmt
+from stmt import Var
+from visitor import Visitor
+
+
+# noinspection PyShadowingNames
+class Resolver(Visitor):
+    """Static pass that binds every local variable reference to a slot.
+
+    Each `Variable`/`Assign` is annotated with the number of block scopes
+    between its use and its declaration (`depth`) and the declaration's index
+    in that scope (`slot`). Names that are not declared in any enclosing block
+    are globals: they keep `depth = None` and get the name's slot in the
+    `globals` table, which is extended as new names turn up and must be the
+    `names` of the `GlobalEnvironment` the program runs in. Shadowing is
+    settled here, so a node resolved to a local never looks at the globals.
+    """
+
+    def __init__(self, globals: Optional[dict[str, int]] = None):
+        self.scopes: list[dict[str, int]] = []
+        self.globals: dict[str, int] = {} if globals is None else globals
+
+    def resolve(self, statements: list[stmt.Stmt]):
+        for statement in statements:
+            self.resolve_stmt(statement)
+
+    def resolve_stmt(self, stmt: stmt.Stmt):
+        stmt.accept(self)
+
+    def resolve_expr(self, expr: expr.Expr):
+        expr.accept(self)
+
+    def begin_scope(self):
+        self.scopes.append({})
+
+    def end_scope(self):
+        return self.scopes.pop()
+
+    def declare(self, name: str):
+        if not self.scopes:
+            return None
+
+        scope = self.scopes[-1]
+        # Redeclaring a name in the same block simply overwrites it, so it
+        # reuses the slot of the earlier declaration.
+        if name not in scope:
+            scope[name] = len(scope)
+
+        return scope[name]
+
+    def global_slot(self, name: str) -> int:
+        globals = self.globals
+        slot = globals.get(name)
+        if slot is None:
+            slot = globals[name] = len(globals)
+
+        return slot
+
+    def resolve_local(self, expr: expr.Variable | expr.Assign):
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if expr.name.lexeme in scope:
+                expr.depth = depth
+                expr.slot = scope[expr.name.lexeme]
+                return
+
+        expr.depth = None
+        expr.slot = self.global_slot(expr.name.lexeme)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        # A block that declares nothing (typically a loop body) runs in the
+        # enclosing scope, so it must not count towards anyone's depth.
+        if not any(isinstance(statement, Var) for statement in stmt.statements):
+            stmt.slot_count = 0
+            self.resolve(stmt.statements)
+            return
+
+        self.begin_scope()
+        self.resolve(stmt.statements)
+        stmt.slot_count = len(self.end_scope())
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        # The initializer is resolved before the name is declared, so
+        # `var a = a;` reads the `a` from the enclosing scope.
+        if stmt.initializer is not None:
+            self.resolve_expr(stmt.initializer)
+
+        if self.scopes:
+            stmt.depth = 0
+            stmt.slot = self.declare(stmt.name.lexeme)
+        else:
+            stmt.depth = None
+            stmt.slot = self.global_slot(stmt.name.lexeme)
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        self.resolve_expr(stmt.expression)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.resolve_stmt(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        self.resolve_expr(stmt.expression)
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.body)
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        self.resolve_local(expr)
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        self.resolve_expr(expr.value)
+        self.resolve_local(expr)
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        self.resolve_expr(expr.expression)
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        pass
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        self.resolve_expr(expr.right)
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from tokens import TokenType, Token
+from tokens import TokenArray, TokenType, Token
+import re
+import sys
 import typing
 
 if typing.TYPE_CHECKING:
@@ -151,7 +153,7 @@ class Scanner:
             self._advance()
 
         if self._is_at_end():
-            self.interpreter.error_line(self.line, "Unterminated string.")
+            self.interpreter.error(line=self.line, message="Unterminated string.")
             return
 
         # The closing ".
@@ -179,7 +181,185 @@ class Scanner:
         while self._is_alphanumeric(self._peek()):
             self._advance()
 
-        text = self.source[self.start : self.current]
+        # Interned, so every occurrence of a name shares one string and
+        # environment lookups find it by identity.
+        text = sys.intern(self.source[self.start : self.current])
         token_type = KEYWORDS.get(text, TokenType.IDENTIFIER)
 
-        self._add_token(token_type)
+        self.tokens.append(Token(token_type, text, None, self.line))
+
+
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# Leading blanks are consumed possessively in front of every token, so they
+# never cost a match of their own nor get handed back to the error branch.
+# The alternatives are ordered most frequent first and together match any
+# other character, so `finditer` never skips input.
+TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r]*+
+    (?:
+        (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OPERATOR>[!=<>]=?|[(){},.\-+;*]|/(?!/))
+      | (?P<NEWLINE>\n[ \t\r\n]*)
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | (?P<STRING>"[^"]*")
+      | (?P<COMMENT>//[^\n]*)
+      | (?P<UNTERMINATED>"[^"]*)
+      | (?P<ERROR>.)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+class FastScanner:
+    """Drop-in replacement for `Scanner` driven by one compiled regex.
+
+    Produces the same tokens and reports the same errors, but lets the regex
+    engine do the character-level work, which is several times faster on
+    large inputs.
+    """
+
+    def __init__(self, source: str, interpreter: lox.Lox):
+        self.source = source
+        self.interpreter = interpreter
+        self.tokens = []
+        self.line = 1
+
+    def scan_tokens(self) -> list[Token]:
+        self.tokens.extend(self._scan(self.source, len(self.source)))
+        self.tokens.append(Token(TokenType.EOF, "", {}, self.line))
+        return self.tokens
+
+    def _scan(self, source: str, limit: int):
+        """Yield the tokens of `source` that end at or before `limit`.
+
+        Returns the offset where scanning stopped, so a caller holding only
+        part of the input can carry the rest over to the next chunk.
+        """
+        keyword = KEYWORDS.get
+        identifier = TokenType.IDENTIFIER
+        intern = sys.intern
+        line = self.line
+        end = 0
+
+        for match in TOKEN_PATTERN.finditer(source):
+            if match.end() > limit:
+                break
+
+            end = match.end()
+            kind = match.lastgroup
+            text = match.group(kind)
+
+            if kind == "IDENTIFIER":
+                text = intern(text)
+                yield Token(keyword(text, identifier), text, None, line)
+            elif kind == "OPERATOR":
+                yield Token(OPERATORS[text], text, None, line)
+            elif kind == "NEWLINE":
+                line += text.count("\n")
+            elif kind == "NUMBER":
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == "STRING":
+                # Like `Scanner`, a multi-line string gets its closing line.
+                line += text.count("\n")
+                yield Token(TokenType.STRING, text, text[1:-1], line)
+            elif kind == "COMMENT":
+                pass
+            elif kind == "UNTERMINATED":
+                line += text.count("\n")
+                self.interpreter.error(line=line, message="Unterminated string.")
+            else:
+                self.interpreter.error(line=line, message="Unexpected character.")
+
+        self.line = line
+        return end
+
+
+class StreamScanner(FastScanner):
+    """Scans a text file object chunk by chunk, yielding tokens lazily.
+
+    Only the current chunk plus the unfinished tail of the previous one is
+    held in memory. A token that ends within the last two characters of a
+    chunk could still grow (`pri|nt`, `1.|5`, `=|=`), so it is deferred
+    until more input arrives.
+    """
+
+    def __init__(self, file: typing.TextIO, interpreter: lox.Lox, chunk_size=1 << 16):
+        super().__init__("", interpreter)
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> typing.Iterator[Token]:
+        buffer = ""
+        while chunk := self.file.read(self.chunk_size):
+            buffer += chunk
+            consumed = yield from self._scan(buffer, len(buffer) - 2)
+            buffer = buffer[consumed:]
+
+        yield from self._scan(buffer, len(buffer))
+        yield Token(TokenType.EOF, "", {}, self.line)
+
+
+class ArrayScanner(FastScanner):
+    """`FastScanner` variant that fills a `TokenArray` instead of a list.
+
+    No `Token`, lexeme or literal object is kept per token, which makes the
+    scanned program several times smaller; `Parser` accepts either form.
+    """
+
+    def scan_tokens(self) -> TokenArray:
+        tokens = TokenArray(self.source)
+        append = tokens.append
+        keyword = KEYWORDS.get
+        identifier = TokenType.IDENTIFIER
+        line = self.line
+
+        for match in TOKEN_PATTERN.finditer(self.source):
+            kind = match.lastgroup
+
+            if kind == "IDENTIFIER":
+                text = match.group(kind)
+                append(keyword(text, identifier), match.start(kind), match.end(), line)
+            elif kind == "OPERATOR":
+                text = match.group(kind)
+                append(OPERATORS[text], match.start(kind), match.end(), line)
+            elif kind == "NEWLINE":
+                line += match.group(kind).count("\n")
+            elif kind == "NUMBER":
+                append(TokenType.NUMBER, match.start(kind), match.end(), line)
+            elif kind == "STRING":
+                line += match.group(kind).count("\n")
+                append(TokenType.STRING, match.start(kind), match.end(), line)
+            elif kind == "COMMENT":
+                pass
+            elif kind == "UNTERMINATED":
+                line += match.group(kind).count("\n")
+                self.interpreter.error(line=line, message="Unterminated string.")
+            else:
+                self.interpreter.error(line=line, message="Unexpected character.")
+
+        self.line = line
+        append(TokenType.EOF, len(self.source), len(self.source), line)
+        return tokens
@@ -0,0 +1,187 @@
+"""Long-running evaluation server on a Unix domain socket.
+
+The protocol is newline-delimited JSON. A client sends one request per
+line, either `{"source": "..."}` or `{"path": "..."}` (read by the server),
+and gets back an `{"output": "..."}` message for every line the script
+prints, as it prints it, followed by one final message:
+
+    {"status": 0, "errors": [], "elapsed": 0.0012}
+
+`status` is the exit status `lox.py` would have used (65 for syntax errors,
+70 for runtime errors, 66 for unreadable paths), `errors` holds the messages
+it would have written to stderr and `elapsed` is the server-side latency in
+seconds. A malformed request gets status 64 and no output. A connection can
+carry any number of requests, one after another.
+
+Scripts run on a pool of warm engine instances in worker threads, so the
+event loop keeps accepting clients and streaming output while they run.
+Every request starts from fresh globals, and a fresh budget when the
+engine has one; nothing leaks between scripts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from budget import BudgetedInterpreter
+from embed import Engine, Program, Reporter
+from exceptions import LoxSyntaxError
+
+# Compiled programs kept per distinct source. Runs only touch their
+# quickening hints (see `embed.Program`), so concurrent requests for the
+# same script share one.
+PROGRAM_CACHE_SIZE = 256
+
+
+def invalid(request) -> Optional[str]:
+    """Say what is wrong with a decoded request, or return None if nothing."""
+    if not isinstance(request, dict):
+        return "Request must be a JSON object."
+    for key in ("path", "source"):
+        if key in request and not isinstance(request[key], str):
+            return f"Request field '{key}' must be a string."
+
+    return None
+
+
+def send(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message).encode() + b"\n")
+
+
+class InterpreterPool:
+    """Warm engine instances, each paired with the reporter it was built with.
+
+    An instance is checked out for exactly one request at a time and reset
+    before it is handed out again.
+    """
+
+    def __init__(self, engine: Engine, size: int):
+        self.engine = engine
+        self.idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            reporter = Reporter()
+            self.idle.put_nowait((reporter, engine.interpreter(reporter)))
+
+    async def acquire(self):
+        return await self.idle.get()
+
+    def release(self, instance):
+        reporter, interpreter = instance
+        reporter.errors = []
+        reporter.runtime_error_raised = None
+        if isinstance(interpreter, BudgetedInterpreter):
+            interpreter.reset_budget()
+        self.idle.put_nowait(instance)
+
+
+class Server:
+    def __init__(self, engine: Engine, workers: int, log: bool = True):
+        self.engine = engine
+        self.workers = workers
+        self.log = log
+        self.programs: dict[str, Program] = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pool: Optional[InterpreterPool] = None
+
+    async def serve(self, path: str):
+        self.pool = InterpreterPool(self.engine, self.workers)
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+
+                problem = invalid(request)
+                if problem is not None:
+                    send(writer, {"status": 64, "errors": [problem], "elapsed": 0.0})
+                    await writer.drain()
+                    continue
+
+                await self.respond(request, writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request: dict, writer: asyncio.StreamWriter):
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        def output(text: str):
+            # Called from the worker thread; writes must happen on the loop.
+            loop.call_soon_threadsafe(send, writer, {"output": str(text)})
+
+        instance = await self.pool.acquire()
+        try:
+            status, errors = await loop.run_in_executor(
+                self.executor, self.run, request, instance, output
+            )
+        except Exception as error:
+            # A Python error escaped the engine, e.g. a division by zero or
+            # a RecursionError; it ends this request, not the connection.
+            status, errors = 70, [f"{type(error).__name__}: {error}"]
+            if self.log:
+                traceback.print_exc()
+        finally:
+            self.pool.release(instance)
+
+        elapsed = time.perf_counter() - start
+        send(writer, {"status": status, "errors": errors, "elapsed": elapsed})
+        await writer.drain()
+        if self.log:
+            name = request.get("path", "<source>")
+            print(f"{status:>3} {elapsed * 1000:9.1f} ms  {name}", file=sys.stderr)
+
+    def run(
+        self, request: dict, instance, output: Callable[[str], None]
+    ) -> tuple[int, list[str]]:
+        if "path" in request:
+            try:
+                with open(request["path"]) as file:
+                    source = file.read()
+            except OSError as error:
+                return 66, [f"Cannot read {request['path']}: {error.strerror}"]
+        else:
+            source = request.get("source", "")
+
+        try:
+            program = self.compile(source)
+        except LoxSyntaxError as error:
+            return 65, error.errors
+
+        reporter, interpreter = instance
+        interpreter.reset_globals(program.global_slots)
+        interpreter.print = output
+        interpreter.interpret(program.statements)
+
+        error = reporter.runtime_error_raised
+        if error is not None:
+            return 70, [f"{error.message}\n[line {error.token.line}]"]
+        return 0, []
+
+    def compile(self, source: str) -> Program:
+        program = self.programs.get(source)
+        if program is None:
+            program = self.engine.compile(source)
+            if len(self.programs) >= PROGRAM_CACHE_SIZE:
+                # Dicts keep insertion order: drop the oldest entry.
+                del self.programs[next(iter(self.programs))]
+            self.programs[source] = program
+
+        return program
+
+
+def serve(path: str, engine: Engine, workers: int, log: bool = True):
+    asyncio.run(Server(engine, workers, log).serve(path))
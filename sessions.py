@@ -0,0 +1,207 @@
+"""Many REPL-like sessions running concurrently on one asyncio event loop.
+
+    async def show(line):
+        await websocket.send(line)
+
+    session = Session(show)
+    await session.run("var x = 1;")
+    await session.run("print x + 1;")  # show("2")
+
+Each session has its own interpreter and globals. Statements run as
+coroutines that hand control back to the event loop every `yield_every`
+statements, so a long loop in one session does not starve the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+import stmt
+from embed import Engine, Reporter
+from environment import SlotEnvironment
+from exceptions import LoxRuntimeError, LoxSyntaxError
+from interpreter import Interpreter, hooked_class
+
+Sink = Callable[[str], Awaitable[None]]
+
+
+# noinspection PyShadowingNames
+class AsyncInterpreter(Interpreter):
+    """`Interpreter` whose statements are coroutines.
+
+    Expressions cannot loop, so they are still evaluated synchronously; only
+    statements are awaited. `print` awaits `sink` instead of writing to
+    stdout. With `yield_every` set to None the interpreter never yields
+    on its own and only suspends when the sink does. `subscribe` works as
+    on `Interpreter`; hooks are plain functions, called synchronously.
+    """
+
+    def __init__(
+        self,
+        interpreter: Reporter,
+        sink: Sink,
+        yield_every: Optional[int] = 100,
+    ):
+        super().__init__(interpreter)
+        self.sink = sink
+        self.yield_every = yield_every
+        self.countdown = yield_every or 0
+
+    def install_hooks(self):
+        plain = getattr(self, "unhooked", type(self))
+        self.__class__ = async_hooked_class(plain) if self.hooks else plain
+
+    async def interpret(self, statements: list[stmt.Stmt]):
+        try:
+            for statement in statements:
+                await self.execute(statement)
+        except LoxRuntimeError as error:
+            for hook in self.hooks.get("runtime_error", ()):
+                hook(error)
+            self.interpreter.runtime_error(error)
+        finally:
+            self.reset_generic()
+
+    async def execute(self, stmt: stmt.Stmt):
+        self.countdown -= 1
+        if self.countdown == 0:
+            self.countdown = self.yield_every
+            await asyncio.sleep(0)
+
+        await stmt.accept(self)
+
+    async def execute_block(self, statements, environment):
+        previous = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                await self.execute(statement)
+        finally:
+            self.environment = previous
+
+    async def visit_block_stmt(self, stmt: stmt.Block):
+        if not stmt.slot_count:
+            for statement in stmt.statements:
+                await self.execute(statement)
+            return
+
+        await self.execute_block(
+            stmt.statements, SlotEnvironment(self.environment, stmt.slot_count)
+        )
+
+    async def visit_expression_stmt(self, stmt: stmt.Stmt):
+        self.evaluate(stmt.expression)
+
+    async def visit_if_stmt(self, stmt: stmt.If):
+        if self.is_truthy(self.evaluate(stmt.condition)):
+            await self.execute(stmt.then_branch)
+        elif stmt.else_branch is not None:
+            await self.execute(stmt.else_branch)
+
+    async def visit_print_stmt(self, stmt: stmt.Stmt):
+        value = self.evaluate(stmt.expression)
+        await self.sink(self.stringify(value))
+
+    async def visit_var_stmt(self, stmt: stmt.Var):
+        super().visit_var_stmt(stmt)
+
+    async def visit_while_stmt(self, stmt: stmt.While):
+        while self.is_truthy(self.evaluate(stmt.condition)):
+            await self.execute(stmt.body)
+
+
+_async_hooked_classes: dict[type, type] = {}
+
+
+def async_hooked_class(cls: type) -> type:
+    """`hooked_class` for an `AsyncInterpreter` subclass.
+
+    The synchronous hooks (`assign`) are inherited; the statement ones are
+    redone as coroutines, calling `cls` directly since the inherited
+    versions would not await it.
+    """
+    if cls in _async_hooked_classes:
+        return _async_hooked_classes[cls]
+
+    # noinspection PyShadowingNames
+    class AsyncHooked(hooked_class(cls)):
+        __slots__ = ()
+        unhooked = cls
+
+        async def execute(self, stmt: stmt.Stmt):
+            for hook in self.hooks.get("execute", ()):
+                hook(stmt)
+            await cls.execute(self, stmt)
+
+        async def visit_block_stmt(self, stmt: stmt.Block):
+            for hook in self.hooks.get("block_enter", ()):
+                hook(stmt)
+            try:
+                await cls.visit_block_stmt(self, stmt)
+            finally:
+                for hook in self.hooks.get("block_exit", ()):
+                    hook(stmt)
+
+        async def visit_var_stmt(self, stmt: stmt.Var):
+            await cls.visit_var_stmt(self, stmt)
+            if stmt.depth is None:
+                value = self.globals.get_slot(stmt.slot, stmt.name)
+            else:
+                value = self.environment.slots[stmt.slot]
+
+            for hook in self.hooks.get("define", ()):
+                hook(stmt.name, value)
+
+    AsyncHooked.__name__ = AsyncHooked.__qualname__ = f"Hooked{cls.__name__}"
+    _async_hooked_classes[cls] = AsyncHooked
+    return AsyncHooked
+
+
+class Session:
+    """One interactive session: snippets run in order against shared globals.
+
+    Syntax and runtime errors are sent to the sink too, formatted as the
+    REPL prints them, and `run` returns the exit status `lox.py` would use;
+    Python errors escaping the interpreter count as runtime errors.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        yield_every: Optional[int] = 100,
+        scanner: str = "fast",
+    ):
+        self.sink = sink
+        self.compiler = Engine(scanner=scanner)
+        self.reporter = Reporter()
+        self.interpreter = AsyncInterpreter(self.reporter, sink, yield_every)
+        # Every snippet is resolved against the session's globals.
+        self.global_slots: dict[str, int] = {}
+        self.interpreter.reset_globals(self.global_slots)
+        # Snippets sent while one is still running wait for it, as in a REPL.
+        self.lock = asyncio.Lock()
+
+    async def run(self, source: str) -> int:
+        async with self.lock:
+            try:
+                program = self.compiler.compile(source, self.global_slots)
+            except LoxSyntaxError as error:
+                for message in error.errors:
+                    await self.sink(message)
+                return 65
+
+            try:
+                await self.interpreter.interpret(program.statements)
+            except Exception as error:
+                # A Python error escaped the interpreter, e.g. from `1/0`.
+                await self.sink(f"{type(error).__name__}: {error}")
+                return 70
+
+            error = self.reporter.runtime_error_raised
+            if error is not None:
+                self.reporter.runtime_error_raised = None
+                await self.sink(f"{error.message}\n[line {error.token.line}]")
+                return 70
+
+            return 0
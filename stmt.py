@@ -6,7 +6,9 @@ from tokens import Token
 
 
 class Stmt:
-    expression = None
+    # Source line the statement starts on, or None for synthesized ones.
+    __slots__ = ("line",)
+    line: Optional[int]
 
     @abstractmethod
     def accept(self, expr: Any):
@@ -14,64 +16,91 @@ class Stmt:
 
 
 class Expression(Stmt):
-    def __init__(self, expression: Expr):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr, line: Optional[int] = None):
         self.expression = expression
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_expression_stmt(self)
 
 
 class Print(Stmt):
-    def __init__(self, expression):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression, line: Optional[int] = None):
         self.expression = expression
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_print_stmt(self)
 
 
 class Var(Stmt):
-    initializer: Expr = None
-    name: Token = None
+    __slots__ = ("name", "initializer", "depth", "slot")
+    initializer: Expr
+    name: Token
 
-    def __init__(self, name: Token, initializer: Expr):
+    def __init__(self, name: Token, initializer: Expr, line: Optional[int] = None):
         self.name = name
         self.initializer = initializer
+        # Filled in by the resolver: `depth = None` declares a global and
+        # `slot` is then its global slot, otherwise its slot in the block.
+        self.depth: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
 
 
 class Block(Stmt):
-    statements: list = None
+    __slots__ = ("statements", "slot_count")
+    statements: list
 
-    def __init__(self, statements):
+    def __init__(self, statements, line: Optional[int] = None):
         self.statements = statements
+        # Number of variables declared directly in the block, set by the
+        # resolver. Blocks with none get no scope of their own at runtime.
+        self.slot_count = 0
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 
 class If(Stmt):
-    condition: Optional[Expr] = None
-    then_branch: Optional[Stmt] = None
-    else_branch: Optional[Stmt] = None
-
-    def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+    condition: Optional[Expr]
+    then_branch: Optional[Stmt]
+    else_branch: Optional[Stmt]
+
+    def __init__(
+        self,
+        condition: Expr,
+        then_branch: Stmt,
+        else_branch: Stmt,
+        line: Optional[int] = None,
+    ):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_if_stmt(self)
 
 
 class While(Stmt):
-    condition: Optional[Expr] = None
-    body: Optional[Stmt] = None
+    __slots__ = ("condition", "body")
+    condition: Optional[Expr]
+    body: Optional[Stmt]
 
-    def __init__(self, condition: Expr, body: Stmt):
+    def __init__(self, condition: Expr, body: Stmt, line: Optional[int] = None):
         self.condition = condition
         self.body = body
+        self.line = line
 
     def accept(self, visitor):
         return visitor.visit_while_stmt(self)
@@ -1,5 +1,7 @@
+import sys
+from array import array
 from enum import Enum, auto
-from typing import Any
+from typing import Any, Iterator
 
 
 class TokenType(Enum):
@@ -54,6 +56,7 @@ class TokenType(Enum):
 
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
     type: TokenType
     lexeme: str
     literal: dict
@@ -67,3 +70,55 @@ class Token:
 
     def __repr__(self):
         return f"{self.type} {self.lexeme} {self.literal}"
+
+
+# `TokenType` values start at 1; index 0 is never used.
+TOKEN_TYPES = (None, *TokenType)
+
+
+class TokenArray:
+    """Tokens stored column-wise instead of as one `Token` object each.
+
+    Types are kept as small ints, and start/end offsets into `source` and
+    line numbers as unsigned ints, so a token costs a few bytes. Indexing
+    builds a `Token` on demand, slicing its lexeme and converting its literal
+    only then.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+
+    def append(self, token_type: TokenType, start: int, end: int, line: int):
+        self.types.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        token_type = TOKEN_TYPES[self.types[index]]
+        lexeme = self.source[self.starts[index] : self.ends[index]]
+
+        if token_type == TokenType.NUMBER:
+            literal = float(lexeme)
+        elif token_type == TokenType.STRING:
+            literal = lexeme[1:-1]
+        elif token_type == TokenType.EOF:
+            literal = {}
+        else:
+            if token_type == TokenType.IDENTIFIER:
+                # Like the scanners do for their tokens.
+                lexeme = sys.intern(lexeme)
+            literal = None
+
+        return Token(token_type, lexeme, literal, self.lines[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self)):
+            yield self[index]
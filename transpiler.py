@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import math
+import typing
+
+import expr
+import stmt
+from environment import Environment
+from exceptions import (
+    OPERAND_MUST_BE_A_NUMBER,
+    OPERANDS_MUST_BE_NUMBERS,
+    OPERANDS_MUST_BE_NUMBERS_OR_STRINGS,
+    LoxRuntimeError,
+)
+from interpreter import Interpreter
+from tokens import Token, TokenType
+from visitor import Visitor
+
+if typing.TYPE_CHECKING:
+    import lox
+
+
+MAIN = "__lox_main"
+
+COMPARISONS = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+}
+
+
+class PythonProgram:
+    """Generated Python source plus what is needed to map errors back to Lox.
+
+    `tokens` holds the operator and name tokens referenced by `__fail(k, ...)`
+    calls in the source, and `global_reads` is the line mapping table: for
+    every generated line, the tokens of the globals it reads, used to turn a
+    `KeyError` from `G[...]` into Lox's "Undefined variable" error.
+    """
+
+    def __init__(self, source: str, tokens: list[Token], global_reads):
+        self.source = source
+        self.tokens = tokens
+        self.global_reads: dict[int, list[Token]] = global_reads
+        self.code = compile(source, "<lox>", "exec")
+
+
+# noinspection PyShadowingNames
+class Transpiler(Visitor):
+    """Translates resolved Lox statements into the source of a Python function.
+
+    Lox globals live in the dict `G`; block locals become Python locals,
+    renamed per scope so shadowing works. Operands are type-checked inline
+    with walrus temporaries so both sides are evaluated before the check,
+    exactly like `Interpreter.visit_binary_expr`.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.indent = 1
+        self.scopes: list[dict[str, str]] = []
+        self.scope_count = 0
+        self.temp_count = 0
+        self.tokens: list[Token] = []
+        self.global_reads: dict[int, list[Token]] = {}
+        self.pending_reads: list[Token] = []
+
+    def transpile(self, statements: list[stmt.Stmt]) -> PythonProgram:
+        self.lines.append(
+            f"def {MAIN}(G, __fail, __undefined, __print, __type=type, __str=str):"
+        )
+        self.emit_suite(statements)
+        return PythonProgram(
+            "\n".join(self.lines) + "\n", self.tokens, self.global_reads
+        )
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+        if self.pending_reads:
+            self.global_reads[len(self.lines)] = self.pending_reads
+            self.pending_reads = []
+
+    def emit_suite(self, statements: list[stmt.Stmt]):
+        start = len(self.lines)
+        for statement in statements:
+            statement.accept(self)
+
+        if len(self.lines) == start:
+            self.emit("pass")
+
+    def temp(self) -> str:
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def token(self, token: Token) -> int:
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    def fail(self, token: Token, message: str) -> str:
+        return f"__fail({self.token(token)}, {message!r})"
+
+    def truthy(self, expression: str) -> str:
+        temp = self.temp()
+        return f"(({temp} := {expression}) is not None and {temp} is not False)"
+
+    def local(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+
+        return None
+
+    def translate(self, expr: expr.Expr) -> str:
+        return expr.accept(self)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        self.scope_count += 1
+        self.scopes.append({})
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.scopes.pop()
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        expression = stmt.expression
+        if (
+            isinstance(expression, expr.Assign)
+            and self.local(expression.name.lexeme) is None
+        ):
+            # The common `x = ...;` on a global becomes a plain store.
+            temp = self.temp()
+            value = self.translate(expression.value)
+            name = expression.name
+            self.emit(
+                f"{temp} = {value}; "
+                f"G[{name.lexeme!r}] = {temp} if {name.lexeme!r} in G "
+                f"else __undefined({self.token(name)})"
+            )
+            return
+
+        self.emit(self.translate(expression))
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        self.emit(f"if {self.truthy(self.translate(stmt.condition))}:")
+        self.indent += 1
+        self.emit_suite([stmt.then_branch])
+        self.indent -= 1
+
+        if stmt.else_branch is not None:
+            self.emit("else:")
+            self.indent += 1
+            self.emit_suite([stmt.else_branch])
+            self.indent -= 1
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        temp = self.temp()
+        value = self.translate(stmt.expression)
+        self.emit(f"__print('nil' if ({temp} := {value}) is None else __str({temp}))")
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer is not None:
+            value = self.translate(stmt.initializer)
+        else:
+            value = "None"
+
+        name = stmt.name.lexeme
+        if not self.scopes:
+            self.emit(f"G[{name!r}] = {value}")
+            return
+
+        # Declared after translating the initializer so `var a = a;` reads
+        # the enclosing `a`; redeclaring in the same block reuses the name.
+        scope = self.scopes[-1]
+        if name not in scope:
+            scope[name] = f"l{self.scope_count}_{name}"
+        self.emit(f"{scope[name]} = {value}")
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        self.emit(f"while {self.truthy(self.translate(stmt.condition))}:")
+        self.indent += 1
+        self.emit_suite([stmt.body])
+        self.indent -= 1
+
+    def visit_literal_expr(self, expr: expr.Literal):
+        value = expr.value
+        # Huge literals and folded constants can overflow: `repr` gives `inf`.
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"float({repr(value)!r})"
+        return repr(value)
+
+    def visit_grouping_expr(self, expr: expr.Grouping):
+        return self.translate(expr.expression)
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        local = self.local(expr.name.lexeme)
+        if local is not None:
+            return local
+
+        self.pending_reads.append(expr.name)
+        return f"G[{expr.name.lexeme!r}]"
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        value = self.translate(expr.value)
+        local = self.local(expr.name.lexeme)
+        if local is not None:
+            return f"({local} := {value})"
+
+        temp = self.temp()
+        name = expr.name.lexeme
+        return (
+            f"(G.__setitem__({name!r}, {temp}) or {temp} if "
+            f"(({temp} := {value}), {name!r} in G)[1] "
+            f"else __undefined({self.token(expr.name)}))"
+        )
+
+    def visit_logical_expr(self, expr: expr.Logical):
+        left = self.translate(expr.left)
+        right = self.translate(expr.right)
+        temp = self.temp()
+        test = f"({temp} := {left}) is not None and {temp} is not False"
+
+        if expr.operator.type == TokenType.OR:
+            return f"({temp} if {test} else {right})"
+
+        return f"({right} if {test} else {temp})"
+
+    def visit_unary_expr(self, expr: expr.Unary):
+        right = self.translate(expr.right)
+        temp = self.temp()
+
+        if expr.operator.type == TokenType.MINUS:
+            return (
+                f"(-{temp} if __type({temp} := {right}) is float "
+                f"else {self.fail(expr.operator, OPERANDS_MUST_BE_NUMBERS)})"
+            )
+
+        return f"(({temp} := {right}) is None or {temp} is False)"
+
+    def visit_binary_expr(self, expr: expr.Binary):
+        left = self.translate(expr.left)
+        right = self.translate(expr.right)
+        operator = expr.operator.type
+
+        if operator == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if operator == TokenType.BANG_EQUAL:
+            return f"(not {left} == {right})"
+
+        a = self.temp()
+        b = self.temp()
+
+        if operator == TokenType.PLUS:
+            # Chained comparison: both operands are evaluated before the
+            # membership test short-circuits anything.
+            return (
+                f"({a} + {b} if __type({a} := {left}) is __type({b} := {right}) "
+                f"in (float, str) else {self.fail(expr.operator, OPERANDS_MUST_BE_NUMBERS_OR_STRINGS)})"
+            )
+
+        # `&` rather than `and` so the right operand is always evaluated.
+        return (
+            f"({a} {COMPARISONS[operator]} {b} if "
+            f"(__type({a} := {left}) is float) & (__type({b} := {right}) is float) "
+            f"else {self.fail(expr.operator, OPERAND_MUST_BE_A_NUMBER)})"
+        )
+
+
+class TranspilingInterpreter:
+    """Execution engine that runs Lox programs as compiled Python code.
+
+    Programs Python refuses to compile (e.g. nested deeper than its parser
+    allows) fall back to the tree-walking `Interpreter`, sharing globals.
+    """
+
+    def __init__(self, interpreter: lox.Lox):
+        self.interpreter = interpreter
+        self.globals = Environment()
+        self.fallback = Interpreter(interpreter=interpreter)
+        self.print = print
+
+    def reset_globals(self, names: dict[str, int]):
+        self.globals = Environment()
+        self.fallback.reset_globals(names)
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        try:
+            program = Transpiler().transpile(statements)
+        except (SyntaxError, RecursionError, MemoryError):
+            # The fallback keeps its globals in slots; hand them over and back.
+            self.fallback.globals.values = self.globals.values
+            self.fallback.print = self.print
+            self.fallback.interpret(statements)
+            self.globals.values = self.fallback.globals.values
+            return
+
+        try:
+            self.run(program)
+        except LoxRuntimeError as error:
+            self.interpreter.runtime_error(error)
+
+    def run(self, program: PythonProgram):
+        namespace = {}
+        exec(program.code, namespace)
+        main = namespace[MAIN]
+
+        def fail(k, message):
+            raise LoxRuntimeError(program.tokens[k], message)
+
+        def undefined(k):
+            name = program.tokens[k]
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'")
+
+        try:
+            main(self.globals.values, fail, undefined, self.print)
+        except KeyError as error:
+            raise self.undefined_global(program, error) from None
+
+    def undefined_global(self, program: PythonProgram, error: KeyError):
+        traceback = error.__traceback__
+        while traceback.tb_next is not None:
+            traceback = traceback.tb_next
+
+        name = error.args[0]
+        for token in program.global_reads.get(traceback.tb_lineno, []):
+            if token.lexeme == name:
+                return LoxRuntimeError(token, f"Undefined variable '{name}'")
+
+        raise error
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import typing
+
+import stmt
+from chunk import (
+    Chunk,
+    OP_ADD,
+    OP_CONSTANT,
+    OP_DEFINE_GLOBAL,
+    OP_DIVIDE,
+    OP_EQUAL,
+    OP_FALSE,
+    OP_GET_GLOBAL,
+    OP_GET_LOCAL,
+    OP_GREATER,
+    OP_GREATER_EQUAL,
+    OP_JUMP,
+    OP_JUMP_IF_FALSE,
+    OP_JUMP_IF_TRUE,
+    OP_LESS,
+    OP_LESS_EQUAL,
+    OP_MULTIPLY,
+    OP_NEGATE,
+    OP_NIL,
+    OP_NOT,
+    OP_NOT_EQUAL,
+    OP_POP,
+    OP_POP_JUMP_IF_FALSE,
+    OP_PRINT,
+    OP_RETURN,
+    OP_SET_GLOBAL,
+    OP_SET_GLOBAL_POP,
+    OP_SET_LOCAL,
+    OP_SET_LOCAL_POP,
+    OP_SUBTRACT,
+    OP_TRUE,
+)
+from compiler import Compiler
+from environment import Environment
+from exceptions import (
+    OPERAND_MUST_BE_A_NUMBER,
+    OPERANDS_MUST_BE_NUMBERS,
+    OPERANDS_MUST_BE_NUMBERS_OR_STRINGS,
+    LoxRuntimeError,
+)
+
+if typing.TYPE_CHECKING:
+    import lox
+
+
+class VM:
+    """Stack-based virtual machine executing chunks produced by `Compiler`.
+
+    Drop-in alternative to `Interpreter`: output and runtime error messages
+    are the same, and globals persist between `interpret` calls so the REPL
+    keeps working.
+    """
+
+    def __init__(self, interpreter: lox.Lox):
+        self.interpreter = interpreter
+        self.globals = Environment()
+        self.print = print
+
+    def reset_globals(self, names: dict[str, int]):
+        self.globals = Environment()
+
+    def interpret(self, statements: list[stmt.Stmt]):
+        chunk = Compiler().compile(statements)
+        try:
+            self.run(chunk)
+        except LoxRuntimeError as error:
+            self.interpreter.runtime_error(error)
+
+    def run(self, chunk: Chunk):
+        # Everything the loop touches is bound to a local for fast access.
+        code = chunk.code.tolist()
+        constants = chunk.constants
+        globals_ = self.globals.values
+        print_ = self.print
+        slots = [None] * chunk.local_count
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = code[ip]
+
+            if op == OP_GET_LOCAL:
+                push(slots[code[ip + 1]])
+                ip += 2
+            elif op == OP_CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == OP_GET_GLOBAL:
+                name = constants[code[ip + 1]]
+                try:
+                    push(globals_[name])
+                except KeyError:
+                    raise LoxRuntimeError(
+                        chunk.tokens[ip], f"Undefined variable '{name}'"
+                    ) from None
+                ip += 2
+            elif op == OP_SET_LOCAL_POP:
+                slots[code[ip + 1]] = pop()
+                ip += 2
+            elif op == OP_SET_GLOBAL_POP:
+                name = constants[code[ip + 1]]
+                if name not in globals_:
+                    raise LoxRuntimeError(
+                        chunk.tokens[ip], f"Undefined variable '{name}'"
+                    )
+                globals_[name] = pop()
+                ip += 2
+            elif op == OP_POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == OP_JUMP:
+                ip = code[ip + 1]
+            elif op == OP_ADD:
+                right = pop()
+                left = stack[-1]
+                if (type(left) is float and type(right) is float) or (
+                    type(left) is str and type(right) is str
+                ):
+                    stack[-1] = left + right
+                else:
+                    raise LoxRuntimeError(
+                        chunk.tokens[ip], OPERANDS_MUST_BE_NUMBERS_OR_STRINGS
+                    )
+                ip += 1
+            elif op == OP_LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left < right
+                ip += 1
+            elif op == OP_SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left - right
+                ip += 1
+            elif op == OP_MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left * right
+                ip += 1
+            elif op == OP_DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left / right
+                ip += 1
+            elif op == OP_GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left > right
+                ip += 1
+            elif op == OP_GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left >= right
+                ip += 1
+            elif op == OP_LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERAND_MUST_BE_A_NUMBER)
+                stack[-1] = left <= right
+                ip += 1
+            elif op == OP_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+                ip += 1
+            elif op == OP_NOT_EQUAL:
+                right = pop()
+                stack[-1] = not stack[-1] == right
+                ip += 1
+            elif op == OP_SET_LOCAL:
+                slots[code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op == OP_SET_GLOBAL:
+                name = constants[code[ip + 1]]
+                if name not in globals_:
+                    raise LoxRuntimeError(
+                        chunk.tokens[ip], f"Undefined variable '{name}'"
+                    )
+                globals_[name] = stack[-1]
+                ip += 2
+            elif op == OP_POP:
+                pop()
+                ip += 1
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == OP_JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 2
+                else:
+                    ip = code[ip + 1]
+            elif op == OP_NIL:
+                push(None)
+                ip += 1
+            elif op == OP_TRUE:
+                push(True)
+                ip += 1
+            elif op == OP_FALSE:
+                push(False)
+                ip += 1
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+                ip += 1
+            elif op == OP_NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    raise LoxRuntimeError(chunk.tokens[ip], OPERANDS_MUST_BE_NUMBERS)
+                stack[-1] = -value
+                ip += 1
+            elif op == OP_PRINT:
+                value = pop()
+                print_("nil" if value is None else str(value))
+                ip += 1
+            elif op == OP_DEFINE_GLOBAL:
+                globals_[constants[code[ip + 1]]] = pop()
+                ip += 2
+            elif op == OP_RETURN:
+                return
+            else:
+                raise RuntimeError(f"Unknown opcode {op} at {ip}")